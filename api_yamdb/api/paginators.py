@@ -1,4 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination, PageNumberPagination, _reverse_ordering,
+)
 
 
 class UsersPagination(PageNumberPagination):
@@ -7,3 +15,157 @@ class UsersPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорный пагинатор, курсор которого хранит значения всех ключей
+    сортировки, например (year, id).
+
+    CursorPagination кладет в курсор только первый ключ и листает
+    серию равных значений через OFFSET. Здесь страница выбирается
+    условием (key > k) OR (key = k AND id > i), которое читает составной
+    индекс; если последний ключ уникален, OFFSET не нужен.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+        ordering = (
+            _reverse_ordering(self.ordering) if reverse else self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, current_position)
+            )
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_keyset_filter(self, ordering, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        conditions = []
+        for index, term in enumerate(ordering):
+            lookup = "lt" if term.startswith("-") else "gt"
+            equal = {
+                name.lstrip("-"): value
+                for name, value in zip(ordering[:index], values)
+            }
+            conditions.append(Q(
+                **equal, **{f"{term.lstrip('-')}__{lookup}": values[index]}
+            ))
+        return reduce(or_, conditions)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for term in ordering:
+            name = term.lstrip("-")
+            value = (
+                instance[name] if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            values.append(
+                value if isinstance(value, (int, float)) else str(value)
+            )
+        return json.dumps(values)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Постраничный пагинатор c курсорным режимом по запросу.
+
+    Курсорный режим включается параметром ?pagination=cursor или наличием
+    ?cursor= и не выполняет COUNT(*) и OFFSET, поэтому дальние страницы
+    обходятся так же дешево, как первая.
+    """
+
+    ordering = "-id"
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_cursor_paginator(self):
+        paginator = KeysetCursorPagination()
+        paginator.ordering = self.ordering
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.page_size = self.page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+
+class TitlePagination(OptionalCursorPagination):
+    """Пагинатор для произведений."""
+
+    ordering = "-id"
+
+
+class ReviewPagination(OptionalCursorPagination):
+    """Пагинатор для отзывов."""
+
+    ordering = "-pub_date"
+
+
+class CommentPagination(OptionalCursorPagination):
+    """Пагинатор для комментариев."""
+
+    ordering = "pub_date"
@@ -1,11 +1,112 @@
+import copy
 from datetime import datetime
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import MANY_RELATION_KWARGS
 
 from .validators import validate_pattern
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (
+    Category, Comment, Genre, LeaderboardEntry, Review, Title
+)
 from core.models import User
+from reviews.services import DISTRIBUTION_FIELDS, set_title_genres
+
+
+def split_param(request, name):
+    value = request.query_params.get(name, "")
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Поля ответа по запросу клиента.
+
+    ?fields= оставляет в ответе только перечисленные поля, ?expand=
+    добавляет или разворачивает поля из Meta.expandable_fields; поле,
+    которого нет среди обычных полей, ?fields= разворачивает и без ?expand=.
+    Применяется только к GET-запросам и только к корневому сериализатору.
+    apply_query_plan по итоговому набору полей выбирает столбцы для
+    only(), select_related и prefetch_related; Meta.sources задает
+    столбцы для полей, которые не соответствуют полю модели.
+    """
+
+    def is_root(self):
+        return self.root is self or (
+            isinstance(self.root, serializers.ListSerializer)
+            and self.root.child is self
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if (
+            request is None
+            or request.method not in SAFE_METHODS
+            or not self.is_root()
+        ):
+            return fields
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        expand = split_param(request, "expand")
+        unknown = set(expand) - set(expandable)
+        if unknown:
+            raise serializers.ValidationError(
+                {"expand": f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        only = split_param(request, "fields")
+        unknown = set(only) - set(fields) - set(expandable)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        # Поле, которое есть только среди expandable_fields, можно
+        # запросить и одним ?fields=: оно разворачивается неявно.
+        expand += [
+            name for name in only
+            if name not in fields and name not in expand
+        ]
+        for name in expand:
+            fields[name] = copy.deepcopy(expandable[name])
+        if only:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in only or name in expand
+            }
+        return fields
+
+    def apply_query_plan(self, queryset, extra_columns=()):
+        sources = getattr(self.Meta, "sources", {})
+        columns = {"pk", *extra_columns}
+        select_related = set()
+        prefetch_related = set()
+        for name, field in self.fields.items():
+            if name in sources:
+                columns.update(sources[name])
+                continue
+            source = field.source
+            if isinstance(field, (
+                serializers.ListSerializer, serializers.ManyRelatedField
+            )):
+                prefetch_related.add(source)
+            elif isinstance(field, serializers.SlugRelatedField):
+                select_related.add(source)
+                columns.update((source, f"{source}__{field.slug_field}"))
+            elif isinstance(field, serializers.BaseSerializer):
+                select_related.add(source)
+                columns.add(source)
+                columns.update(
+                    f"{source}__{child.source}"
+                    for child in field.fields.values()
+                )
+            elif source != "*":
+                columns.add(source)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.prefetch_related(*prefetch_related).only(*columns)
 
 
 class SignupSerializer(serializers.ModelSerializer):
@@ -169,7 +270,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ("name", "slug")
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для GET-запросов к произведениям."""
 
     category = CategorySerializer(read_only=True)
@@ -183,15 +284,96 @@ class TitleReadSerializer(serializers.ModelSerializer):
             "category", "genre", "description",
             "rating"
         )
+        expandable_fields = {
+            "score_distribution": serializers.DictField(
+                child=serializers.IntegerField(), read_only=True
+            ),
+        }
+        sources = {"score_distribution": DISTRIBUTION_FIELDS}
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор мест в рейтинге лучших произведений."""
+
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ("position", "weighted_rating", "title")
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Список слагов, который разрешается одним запросом IN."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.resolve(data)
+
+
+def normalize_slug(value):
+    """Слаг из запроса в виде строки; None, если значение не слаг."""
+    if not isinstance(value, (str, int)) or isinstance(value, bool):
+        return None
+    return smart_str(value)
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который c many=True не запрашивает слаги по одному.
+
+    Если в контексте есть slug_cache ({модель: {слаг: объект}}), объекты
+    берутся из него без запросов: так проверяется сразу много объектов.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def get_objects(self, slugs):
+        queryset = self.get_queryset()
+        cache = self.context.get("slug_cache", {})
+        if queryset.model in cache:
+            objects = cache[queryset.model]
+            return {slug: objects[slug] for slug in slugs if slug in objects}
+        return {
+            smart_str(getattr(obj, self.slug_field)): obj
+            for obj in queryset.filter(**{f"{self.slug_field}__in": slugs})
+        }
+
+    def resolve(self, data):
+        slugs = []
+        for value in data:
+            slug = normalize_slug(value)
+            if slug is None:
+                self.fail("invalid")
+            slugs.append(slug)
+        slugs = list(dict.fromkeys(slugs))
+        objects = self.get_objects(slugs)
+        for slug in slugs:
+            if slug not in objects:
+                self.fail(
+                    "does_not_exist", slug_name=self.slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
+
+    def to_internal_value(self, data):
+        return self.resolve([data])[0]
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для произведений."""
 
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         slug_field="slug",
         queryset=Category.objects.all())
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         slug_field="slug",
         queryset=Genre.objects.all(),
         many=True
@@ -201,6 +383,33 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         model = Title
         fields = ("id", "name", "year", "category", "genre", "description")
 
+    @staticmethod
+    def get_slug_cache(items):
+        """
+        Категории и жанры всех элементов items двумя запросами IN.
+
+        Слаги приводятся к строке так же, как в BulkSlugRelatedField.
+
+        Результат передается в контекст как slug_cache при проверке
+        множества произведений.
+        """
+        slugs = {Category: set(), Genre: set()}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            slugs[Category].add(normalize_slug(item.get("category")))
+            if isinstance(item.get("genre"), list):
+                slugs[Genre].update(map(normalize_slug, item["genre"]))
+        return {
+            model: {
+                obj.slug: obj
+                for obj in model.objects.filter(
+                    slug__in=model_slugs - {None}
+                )
+            }
+            for model, model_slugs in slugs.items()
+        }
+
     def validate(self, data):
         if "year" in data:
             if int(data["year"]) > datetime.today().year:
@@ -209,31 +418,44 @@ class TitleWriteSerializer(serializers.ModelSerializer):
                 )
         return data
 
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = validated_data.pop("genre", [])
+        title = super().create(validated_data)
+        set_title_genres(title, [genre.pk for genre in genres])
+        return title
 
-class ReviewSerializer(serializers.ModelSerializer):
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres = validated_data.pop("genre", None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            set_title_genres(title, [genre.pk for genre in genres])
+        return title
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Сериализатор автора для ?expand=author."""
+
+    class Meta:
+        model = User
+        fields = ("username", "first_name", "last_name", "bio")
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для отзывов."""
 
     author = serializers.SlugRelatedField(
         read_only=True, slug_field="username"
     )
 
-    def validate(self, data):
-        author = self.context["request"].user
-        title_id = self.context["view"].kwargs.get("title_id")
-        if self.context["request"].method == "POST":
-            if Review.objects.filter(
-                author=author, title_id=title_id
-            ).exists():
-                raise serializers.ValidationError(
-                    "Ha одно произведение можно оставить только 1 отзыв!")
-        return data
-
     class Meta:
         model = Review
         fields = "__all__"
+        expandable_fields = {"author": AuthorSerializer(read_only=True)}
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -244,3 +466,4 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = "__all__"
         read_only_fields = ("review", "author")
+        expandable_fields = {"author": AuthorSerializer(read_only=True)}
@@ -4,6 +4,7 @@ from rest_framework import routers
 from .views import (
     CategoryViewSet,
     CommentViewSet,
+    ExportView,
     GenreViewSet,
     ReviewViewSet,
     SignupView,
@@ -34,5 +35,6 @@ urlpatterns = [
         {"get": "me", "patch": "me"})),
     path("v1/users/<slug:username>/", UserViewSet.as_view(
         {"get": "retrieve", "patch": "update", "delete": "destroy"})),
+    path("v1/export/<str:filename>", ExportView.as_view()),
     path("v1/", include(router.urls)),
 ]
@@ -1,16 +1,27 @@
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import (
     AllowAny, IsAuthenticated
 )
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title, User
+from core.cache import ALL, version_key
+from core.deletion import delete_reviews
+from reviews.models import (
+    RATING_SORT_KEY, Category, Comment, Genre, GenreTitle, LeaderboardEntry,
+    Review, Title, User,
+)
 
 from .permissions import (
     IsAdmin,
@@ -23,6 +34,7 @@ from .serializers import (
     ConfirmSerializer,
     CommentSerializer,
     GenreSerializer,
+    LeaderboardEntrySerializer,
     MePatchSerializer,
     ReviewSerializer,
     SignupSerializer,
@@ -30,9 +42,28 @@ from .serializers import (
     TitleWriteSerializer,
     UsersSerializer,
 )
-from .viewsets import CreateListDestroyViewSet
-from .paginators import UsersPagination
-from core.services import send_confirmation_email, generate_confirmation_code
+from .viewsets import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    CreateListDestroyViewSet,
+    FastDestroyMixin,
+    NestedListMixin,
+    SparseFieldsetMixin,
+)
+from .paginators import (
+    CommentPagination,
+    ReviewPagination,
+    TitlePagination,
+    UsersPagination,
+)
+from core.export import EXPORTS_BY_NAME, FORMATS, iter_export, iter_gzip
+from core.services import generate_confirmation_code, queue_confirmation_email
+from reviews.autocomplete import MAX_SUGGESTIONS, title_index
+from reviews.search import search_titles
+from reviews.services import bulk_create_titles
+from .parsers import NDJSONParser
+
+TITLES_BULK_MAX_ITEMS = getattr(settings, "TITLES_BULK_MAX_ITEMS", 5000)
 
 
 class SignupView(generics.CreateAPIView):
@@ -58,12 +89,13 @@ class SignupView(generics.CreateAPIView):
                 serializer.data, status=status.HTTP_200_OK, headers=headers
             )
 
+    @transaction.atomic
     def perform_create(self, serializer):
         user = serializer.save()
         user.set_unusable_password()
         user.confirmation_code = generate_confirmation_code()
         user.save()
-        send_confirmation_email(user.email, user.confirmation_code)
+        queue_confirmation_email(user.email, user.confirmation_code)
 
 
 class TokenView(generics.CreateAPIView):
@@ -89,7 +121,7 @@ class TokenView(generics.CreateAPIView):
         return Response(token, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(FastDestroyMixin, viewsets.ModelViewSet):
     """
     ViewSet для взаимодействия с моделью пользователя.
     """
@@ -130,7 +162,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedListMixin, CreateListDestroyViewSet):
     """ViewSet для категорий."""
 
     queryset = Category.objects.all()
@@ -140,9 +172,11 @@ class CategoryViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+    cache_models = (Category,)
+    cache_query_params = ("page", "search")
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedListMixin, CreateListDestroyViewSet):
     """ViewSet для жанров."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -151,90 +185,416 @@ class GenreViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+    cache_models = (Genre,)
+    cache_query_params = ("page", "search")
+
+
+def get_slugs(request, param):
+    """Список slug из параметра вида ?genre=drama,comedy без повторов."""
+    value = request.query_params.get(param, "")
+    return list(dict.fromkeys(
+        slug.strip() for slug in value.split(",") if slug.strip()
+    ))
 
 
 class GenreFilter(filters.BaseFilterBackend):
-    """Фильтр для поиска по slug жанра."""
+    """
+    Фильтр по slug жанров.
+
+    По умолчанию (genre_mode=any) возвращает произведения хотя бы c одним
+    из жанров, при genre_mode=all — только c каждым из них. Фильтр
+    выполняется подзапросом к промежуточной таблице в том же запросе,
+    что и выборка произведений; неизвестный slug дает пустой результат.
+    """
+
+    modes = ("any", "all")
 
     def filter_queryset(self, request, queryset, view):
-        genre_slug = request.query_params.get("genre")
-        if genre_slug:
-            genre = get_object_or_404(Genre, slug=genre_slug)
-            queryset = queryset.filter(genre=genre)
-        return queryset
+        slugs = get_slugs(request, "genre")
+        if not slugs:
+            return queryset
+        mode = request.query_params.get("genre_mode", "any")
+        if mode not in self.modes:
+            raise ValidationError(
+                {"genre_mode": f"Допустимые значения: {', '.join(self.modes)}"}
+            )
+        title_ids = GenreTitle.objects.filter(genre__slug__in=slugs)
+        if mode == "all" and len(slugs) > 1:
+            title_ids = (
+                title_ids.values("title_id")
+                .annotate(matched=Count("genre_id"))
+                .filter(matched=len(slugs))
+            )
+        return queryset.filter(id__in=title_ids.values("title_id"))
 
 
 class CategoryFilter(filters.BaseFilterBackend):
-    """Фильтр для поиска по slug категории."""
+    """Фильтр по slug одной или нескольких категорий через запятую."""
 
     def filter_queryset(self, request, queryset, view):
-        category_slug = request.query_params.get("category")
-        if category_slug:
-            category = get_object_or_404(Category, slug=category_slug)
-            queryset = queryset.filter(category=category)
+        slugs = get_slugs(request, "category")
+        if slugs:
+            queryset = queryset.filter(category__slug__in=slugs)
         return queryset
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка ?ordering= по одному из ключей rating, year, name, id;
+    c минусом — по убыванию.
+
+    К ключу добавляется id в том же направлении, поэтому порядок
+    однозначен, и для каждого ключа есть составной индекс. Этот же
+    порядок использует курсорная пагинация.
+    """
+
+    ordering_fields = ("rating", "year", "name", "id")
+    sort_keys = {"rating": "rating_key"}
+
+    def get_ordering(self, request, queryset, view):
+        terms = self.remove_invalid_fields(
+            queryset,
+            request.query_params.get(self.ordering_param, "").split(","),
+            view,
+            request,
+        )
+        if not terms or terms[0].lstrip("-") == "id":
+            return (terms[0],) if terms else ("-id",)
+        direction = "-" if terms[0].startswith("-") else ""
+        key = terms[0].lstrip("-")
+        return (f"{direction}{self.sort_keys.get(key, key)}", f"{direction}id")
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if "rating_key" in ordering[0]:
+            queryset = queryset.annotate(rating_key=RATING_SORT_KEY)
+        return queryset.order_by(*ordering)
+
+
+class TitleSearchFilter(filters.BaseFilterBackend):
+    """
+    Полнотекстовый поиск ?q= по названию и описанию произведения.
+
+    Без ?ordering= результаты упорядочены по релевантности. Пустой ?q=
+    не фильтрует, как и пустые genre и category: ключ кеша списка не
+    учитывает пустые параметры.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get("q", "")
+        if not text.strip():
+            return queryset
+        return search_titles(
+            queryset,
+            text,
+            ranked=(
+                TitleOrderingFilter.ordering_param not in request.query_params
+            ),
+        )
+
+
+class TitleViewSet(
+    FastDestroyMixin,
+    SparseFieldsetMixin,
+    ConditionalGetMixin,
+    CachedListMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для произведений."""
 
-    queryset = Title.objects.all()
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
     permission_classes = [IsAdmin | ReadOnly]
-    pagination_class = PageNumberPagination
-    filter_backends = (DjangoFilterBackend, GenreFilter, CategoryFilter)
+    pagination_class = TitlePagination
+    filter_backends = (
+        TitleOrderingFilter,
+        DjangoFilterBackend,
+        GenreFilter,
+        CategoryFilter,
+        TitleSearchFilter,
+    )
     filterset_fields = (
         "name",
         "year",
     )
+    cache_models = (Title, Genre, Category, Review)
+    cache_query_params = (
+        "page", "pagination", "cursor",
+        "genre", "genre_mode", "category", "name", "year", "q", "ordering",
+        "fields", "expand",
+    )
 
     def get_serializer_class(self):
         if self.request.method == "GET":
             return TitleReadSerializer
         return TitleWriteSerializer
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.method == "GET":
-            queryset = queryset.annotate(
-                rating=Avg("reviews__score")).order_by("-id")
-        return queryset
+    def get_extra_columns(self):
+        ordering = TitleOrderingFilter().get_ordering(self.request, None, self)
+        return [
+            key.lstrip("-") for key in ordering
+            if key.lstrip("-") != "rating_key"
+        ]
+
+    def get_etag_versions(self):
+        if self.action == "retrieve":
+            return (
+                version_key(Title, self.kwargs["pk"]),
+                version_key(Title, ALL),
+                Genre,
+                Category,
+            )
+        return self.cache_models
 
+    @action(detail=False)
+    def top(self, request):
+        """
+        Лучшие произведения по взвешенному рейтингу: все или одной
+        категории, жанра или года выпуска.
 
-class ReviewViewSet(viewsets.ModelViewSet):
+        Рейтинги заранее рассчитывает команда refresh_leaderboards.
+        """
+        scopes = [
+            scope for scope in ("category", "genre", "year")
+            if scope in request.query_params
+        ]
+        if len(scopes) > 1:
+            raise ValidationError(
+                "Укажите не больше одного из параметров category, genre, year"
+            )
+        entries = LeaderboardEntry.objects.select_related(
+            "title__category"
+        ).prefetch_related("title__genre")
+        if not scopes:
+            entries = entries.filter(scope=LeaderboardEntry.OVERALL)
+        else:
+            scope = scopes[0]
+            value = request.query_params[scope]
+            if scope == "year":
+                if not value.isdigit():
+                    raise ValidationError({"year": "Ожидается число"})
+                lookup = {"year": value}
+            else:
+                lookup = {f"{scope}__slug": value}
+            entries = entries.filter(scope=scope, **lookup)
+        serializer = LeaderboardEntrySerializer(
+            entries.order_by("position"),
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def autocomplete(self, request):
+        """
+        Подсказки по началу названия из индекса в памяти процесса.
+
+        Запрос к БД выполняется только при построении индекса.
+        """
+        limit = request.query_params.get("limit", "10")
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_SUGGESTIONS:
+            raise ValidationError(
+                {"limit": f"Ожидается число от 1 до {MAX_SUGGESTIONS}"}
+            )
+        return Response(title_index.suggest(
+            request.query_params.get("prefix", ""), int(limit)
+        ))
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAdmin],
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        """
+        Создает много произведений одним запросом.
+
+        Тело — JSON-массив или NDJSON c произведениями в формате
+        TitleWriteSerializer. Категории и жанры всех элементов выбираются
+        двумя запросами, корректные произведения создаются пакетно в одной
+        транзакции, для остальных в results возвращаются ошибки.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Ожидается список"]}
+            )
+        if len(items) > TITLES_BULK_MAX_ITEMS:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f"Не больше {TITLES_BULK_MAX_ITEMS} произведений"
+                ]
+            })
+        context = self.get_serializer_context()
+        context["slug_cache"] = TitleWriteSerializer.get_slug_cache(items)
+        results = []
+        valid = []
+        for item in items:
+            serializer = TitleWriteSerializer(data=item, context=context)
+            if serializer.is_valid():
+                results.append(None)
+                valid.append((len(results) - 1, serializer.validated_data))
+            else:
+                results.append({
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": serializer.errors,
+                })
+        titles = bulk_create_titles([data for _, data in valid])
+        for (index, _), title in zip(valid, titles):
+            results[index] = {
+                "status": status.HTTP_201_CREATED, "id": title.pk
+            }
+        return Response(
+            {"created": len(titles), "results": results},
+            status=(
+                status.HTTP_201_CREATED if len(titles) == len(items)
+                else status.HTTP_207_MULTI_STATUS
+            ),
+        )
+
+
+class ReviewViewSet(
+    NestedListMixin,
+    SparseFieldsetMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для оценок."""
 
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorOrReadOnly | IsModeratorOrAdminOrReadOnly]
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
         return Review.objects.filter(title_id=self.kwargs["title_id"])
 
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(
-            author=self.request.user, title=title
+    def get_parent_queryset(self):
+        return Title.objects.filter(pk=self.kwargs["title_id"])
+
+    def perform_destroy(self, instance):
+        delete_reviews(Review.objects.filter(pk=instance.pk))
+
+    def get_etag_versions(self):
+        if self.action == "retrieve":
+            return (
+                version_key(Review, self.kwargs["pk"]),
+                version_key(Review, ALL),
+                User,
+            )
+        return (
+            version_key(Review, f"title={self.kwargs['title_id']}"),
+            version_key(Review, ALL),
+            User,
         )
 
+    def perform_create(self, serializer):
+        """
+        Создает отзыв одним INSERT.
 
-class CommentViewSet(viewsets.ModelViewSet):
+        Существование произведения и единственность отзыва автора
+        проверяет база (внешний ключ и unique_author_title); запросы для
+        выбора ответа выполняются, только если INSERT не удался.
+        """
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user,
+                    title_id=int(self.kwargs["title_id"]),
+                )
+        except IntegrityError:
+            if not self.get_parent_queryset().exists():
+                raise Http404
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    "Ha одно произведение можно оставить только 1 отзыв!"
+                ]
+            })
+
+
+class CommentViewSet(
+    NestedListMixin,
+    SparseFieldsetMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для комментариев."""
 
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrReadOnly | IsModeratorOrAdminOrReadOnly]
+    pagination_class = CommentPagination
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get("review_id"),
-            title_id=self.kwargs.get("title_id")
+        return Comment.objects.filter(
+            review_id=self.kwargs["review_id"],
+            review__title_id=self.kwargs["title_id"],
+        )
+
+    def get_parent_queryset(self):
+        return Review.objects.filter(
+            pk=self.kwargs["review_id"], title_id=self.kwargs["title_id"]
+        )
+
+    def get_etag_versions(self):
+        if self.action == "retrieve":
+            return (
+                version_key(Comment, self.kwargs["pk"]),
+                version_key(Comment, ALL),
+                User,
+            )
+        return (
+            version_key(Review, self.kwargs["review_id"]),
+            version_key(Comment, f"review={self.kwargs['review_id']}"),
+            version_key(Comment, ALL),
+            User,
         )
-        return review.comments.all()
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get("review_id"),
-            title=self.kwargs.get("title_id")
+        """
+        Создает комментарий без загрузки отзыва.
+
+        Внешний ключ не проверяет, что отзыв относится к произведению из
+        адреса, поэтому перед INSERT выполняется один EXISTS; удаление
+        отзыва между ними тоже дает 404.
+        """
+        if not self.get_parent_queryset().exists():
+            raise Http404
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user,
+                    review_id=int(self.kwargs["review_id"]),
+                )
+        except IntegrityError:
+            raise Http404
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка таблицы для администраторов.
+
+    Имя файла задает таблицу, формат и сжатие: titles.csv, review.ndjson.gz.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request, filename):
+        name, _, extension = filename.partition(".")
+        compress = extension.endswith(".gz")
+        data_format = extension[:-len(".gz")] if compress else extension
+        if name not in EXPORTS_BY_NAME or data_format not in FORMATS:
+            raise Http404
+        content = iter_export(EXPORTS_BY_NAME[name], data_format)
+        content_type = (
+            "text/csv; charset=utf-8" if data_format == "csv"
+            else "application/x-ndjson; charset=utf-8"
         )
-        serializer.save(
-            author=self.request.user, review=review
+        if compress:
+            content = iter_gzip(content)
+            content_type = "application/gzip"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}"'
         )
+        return response
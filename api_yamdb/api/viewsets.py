@@ -1,4 +1,14 @@
-from rest_framework import mixins, viewsets
+from django.conf import settings
+from django.http import Http404
+from django.utils.http import (
+    http_date, parse_etags, parse_http_date_safe, quote_etag
+)
+from rest_framework import mixins, status, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core.cache import get_response_cache, get_versions, make_key
+from core.deletion import delete_instance, needs_background, queue_deletion
 
 
 class CreateListDestroyViewSet(
@@ -8,3 +18,170 @@ class CreateListDestroyViewSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class SparseFieldsetMixin:
+    """
+    Загружает для GET-запросов только столбцы и связи, нужные полям ответа.
+
+    Набор полей определяет сериализатор c SparseFieldsMixin по ?fields= и
+    ?expand=. План применяется в filter_queryset, а не в get_queryset,
+    потому что представления переопределяют get_queryset для вложенных
+    ресурсов. get_extra_columns добавляет столбцы, нужные самому
+    представлению; по умолчанию это ключ сортировки пагинатора.
+    """
+
+    def get_extra_columns(self):
+        ordering = getattr(self.pagination_class, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return [key.lstrip("-") for key in ordering]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        if not hasattr(serializer, "apply_query_plan"):
+            return queryset
+        return serializer.apply_query_plan(
+            queryset, self.get_extra_columns()
+        )
+
+
+class NestedListMixin:
+    """
+    Вложенный список, родитель которого проверяется без отдельного запроса.
+
+    get_queryset фильтрует строки по родителю, поэтому непустая страница
+    уже доказывает, что родитель существует. Запрос get_parent_queryset
+    выполняется, только если страница пуста.
+    """
+
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.get_parent_queryset().exists():
+            raise Http404
+        return page
+
+
+class FastDestroyMixin:
+    """
+    Удаление через core.deletion set-based запросами.
+
+    Если вместе c объектом удаляется больше DELETION_BACKGROUND_THRESHOLD
+    отзывов и комментариев, удаление ставится в очередь: ответ 202 c id
+    задания возвращается сразу, а объект удаляет run_deletion_jobs.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if needs_background(instance):
+            job = queue_deletion(instance)
+            return Response(
+                {"job": job.pk, "status": job.status},
+                status=status.HTTP_202_ACCEPTED,
+            )
+        delete_instance(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CachedListMixin:
+    """
+    Кеширует ответы на анонимные запросы списка.
+
+    Ключ включает путь, нормализованные параметры запроса и версии моделей
+    из cache_models, которые увеличиваются сигналами при каждом изменении,
+    поэтому устаревшие ответы не отдаются и удалять ключи не нужно.
+    Запросы c параметрами вне cache_query_params не кешируются.
+    """
+
+    cache_models = ()
+    cache_query_params = ("page",)
+
+    def get_list_cache_key(self, request):
+        params = request.query_params
+        if any(name not in self.cache_query_params for name in params):
+            return None
+        normalized = sorted(
+            (name, value)
+            for name in params
+            for value in params.getlist(name)
+            if value != ""
+        )
+        return make_key(
+            request.get_host(),
+            request.path,
+            normalized,
+            get_versions(self.cache_models),
+        )
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        key = self.get_list_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+        cache = get_response_cache()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка ETag и Last-Modified для list и retrieve.
+
+    Метка строится из версий, которые возвращает get_etag_versions: это
+    модели или ключи core.cache.version_key, обновляемые сигналами. Ответ
+    304 отдается без основного запроса к БД и без сериализации.
+    """
+
+    def get_etag_versions(self):
+        raise NotImplementedError
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_etag_versions())
+        etag = quote_etag(make_key(
+            request.path, sorted(request.query_params.lists()), versions
+        ))
+        last_modified = max(versions) // 10 ** 9
+        if_none_match = request.headers.get("If-None-Match")
+        if_modified_since = parse_http_date_safe(
+            request.headers.get("If-Modified-Since", "")
+        )
+        if if_none_match is not None:
+            not_modified = (
+                etag in parse_etags(if_none_match) or if_none_match == "*"
+            )
+        else:
+            not_modified = (
+                if_modified_since is not None
+                and last_modified <= if_modified_since
+            )
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,3 +1,4 @@
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -25,6 +26,12 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=15),
 }
 
+# Authenticated user cache settings
+
+AUTH_USER_CACHE_SIZE = 1024
+
+AUTH_USER_CACHE_TTL = 60
+
 
 # Application definition
 
@@ -47,7 +54,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
@@ -95,6 +102,44 @@ DATABASES = {
     }
 }
 
+# Cache settings
+# Response cache and ETag versions live here. The backend must be shared by
+# all processes (workers and management commands), otherwise a write from
+# another process never changes the versions; the core.E001 check rejects
+# process-local backends. Use Redis or Memcached with several servers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "api_yamdb_cache",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+}
+
+RESPONSE_CACHE_ALIAS = "default"
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Title autocomplete index settings (seconds between full rebuilds)
+
+AUTOCOMPLETE_INDEX_TTL = 300
+
+# Top titles leaderboards: places per leaderboard and the number of
+# average-score votes added to every title in the weighted rating
+
+LEADERBOARD_SIZE = 100
+
+LEADERBOARD_MIN_VOTES = 10
+
+# Maximum number of titles in one POST /api/v1/titles/bulk/ request
+
+TITLES_BULK_MAX_ITEMS = 5000
+
+# Titles and users whose deletion removes more reviews and comments than
+# this are deleted by the run_deletion_jobs command (None disables it).
+
+DELETION_BACKGROUND_THRESHOLD = None
+
 # Custom user declaration
 
 AUTH_USER_MODEL = "core.User"
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from .models import User
+from .models import DeletionJob, OutgoingEmail, User
 
 admin.site.register(User)
+admin.site.register(OutgoingEmail)
+admin.site.register(DeletionJob)
@@ -0,0 +1,70 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """
+    Ограниченный по размеру LRU-кеш пользователей c временем жизни записей.
+
+    Кеш локален для процесса: в других процессах запись устаревает не
+    позже, чем через ttl секунд.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            item = self.items.get(user_id)
+            if item is None:
+                return None
+            expires, user = item
+            if expires < time.monotonic():
+                del self.items[user_id]
+                return None
+            self.items.move_to_end(user_id)
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.items[user_id] = (time.monotonic() + self.ttl, user)
+            self.items.move_to_end(user_id)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.items.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, "AUTH_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, берущая пользователя из кеша процесса."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            user = user_cache.get(str(user_id))
+            if user is not None:
+                return user
+        user = super().get_user(validated_token)
+        user_cache.set(str(user_id), copy.copy(user))
+        return user
@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Часть version_key для всех объектов модели; ее учитывают метки
+# отдельных объектов, а повышают массовые изменения без сигналов.
+ALL = "*"
+
+
+def get_response_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def version_key(model, scope=None):
+    """Ключ версии модели целиком или ее части, например отзывов title=1."""
+    key = f"version:{model._meta.label_lower}"
+    if scope is not None:
+        key = f"{key}:{scope}"
+    return key
+
+
+def _as_key(item):
+    return item if isinstance(item, str) else version_key(item)
+
+
+def get_versions(items):
+    """
+    Текущие версии моделей или ключей из version_key.
+
+    Версия - время последнего изменения в наносекундах. Отсутствующая
+    версия создается из текущего времени, а не c нуля, чтобы после
+    вытеснения из кеша она не совпала c прежней.
+    """
+    cache = get_response_cache()
+    keys = [_as_key(item) for item in items]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*items):
+    """
+    Делает недействительными все ответы, зависящие от моделей.
+
+    Внутри транзакции версии меняются только после COMMIT: иначе
+    параллельный запрос мог бы закешировать еще старые строки под новой
+    версией. При откате версии не меняются. Вне транзакции — сразу.
+    """
+    keys = [_as_key(item) for item in items]
+
+    def bump():
+        now = time.time_ns()
+        get_response_cache().set_many(
+            {key: now for key in keys}, timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+def bump_all_versions(*models):
+    """Делает недействительными ответы о моделях и о каждом их объекте."""
+    bump_versions(*models, *(version_key(model, ALL) for model in models))
+
+
+def make_key(*parts):
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode("utf8")
+    ).hexdigest()
+    return f"response:{digest}"
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    """
+    Кеш ответов должен быть общим для всех процессов проекта.
+
+    В нем хранятся версии, из которых строятся ключи кеша списков и ETag.
+    Изменения из других процессов (воркеров gunicorn, import_csv,
+    generate_fake_data, run_deletion_jobs) меняют версии только в общем
+    кеше; c локальным кешем процесс отдавал бы устаревшие списки и 304.
+    """
+    alias = getattr(settings, "RESPONSE_CACHE_ALIAS", None) or "default"
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"Кеш ответов {alias!r} ({backend}) локален для процесса.",
+            hint=(
+                "Укажите в CACHES общий для процессов кеш: FileBasedCache "
+                "на одном сервере, Redis или Memcached на нескольких."
+            ),
+            id="core.E001",
+        )
+    ]
@@ -0,0 +1,204 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.cache import bump_versions, version_key
+from core.models import DeletionJob, User
+from reviews.autocomplete import title_index
+from reviews.models import Comment, Review, Title
+from reviews.services import remove_scores
+
+# Удаления c большим каскадом выполняются заданием; None — всегда сразу.
+BACKGROUND_THRESHOLD = getattr(
+    settings, "DELETION_BACKGROUND_THRESHOLD", None
+)
+
+
+def _raw_delete(queryset):
+    """Один DELETE без загрузки объектов, каскадов и сигналов."""
+    return queryset._raw_delete(queryset.db)
+
+
+def _delete_comments(comments):
+    """Удаляет комментарии одним DELETE; возвращает ключи их версий."""
+    keys = set()
+    for comment_id, review_id in comments.values_list("id", "review_id"):
+        keys.add(version_key(Comment, comment_id))
+        keys.add(version_key(Comment, f"review={review_id}"))
+    _raw_delete(comments)
+    return keys
+
+
+def _delete_reviews(reviews):
+    """
+    Удаляет отзывы и комментарии к ним двумя DELETE.
+
+    Возвращает {id произведения: {оценка: число удаленных отзывов}} и
+    ключи версий удаленных объектов; счетчики произведений не меняются.
+    """
+    reviews = Review.objects.filter(pk__in=reviews.values("pk")).order_by()
+    counts = defaultdict(dict)
+    for title_id, score, count in (
+        reviews.exclude(title=None)
+        .values_list("title_id", "score").annotate(count=Count("id"))
+    ):
+        counts[title_id][score] = count
+    keys = _delete_comments(
+        Comment.objects.filter(review__in=reviews.values("pk"))
+    )
+    keys.update(
+        version_key(Review, review_id)
+        for review_id in reviews.values_list("id", flat=True)
+    )
+    for title_id in counts:
+        keys.add(version_key(Review, f"title={title_id}"))
+        keys.add(version_key(Title, title_id))
+    _raw_delete(reviews)
+    return counts, keys
+
+
+def delete_reviews(reviews):
+    """
+    Удаляет отзывы set-based запросами; возвращает число удаленных.
+
+    Счетчики каждого затронутого произведения сдвигаются одним UPDATE на
+    суммы удаленных оценок, как remove_score для одного отзыва.
+    """
+    with transaction.atomic():
+        counts, keys = _delete_reviews(reviews)
+        for title_id, score_counts in counts.items():
+            remove_scores(title_id, score_counts)
+    deleted = 0
+    for title_id, score_counts in counts.items():
+        title_index.add_popularity(title_id, -sum(score_counts.values()))
+        deleted += sum(score_counts.values())
+    bump_versions(Review, Title, *keys)
+    return deleted
+
+
+def delete_titles(titles):
+    """
+    Удаляет произведения; возвращает число удаленных.
+
+    Отзывы и комментарии удаляются set-based запросами, а сами
+    произведения — обычным delete(), чтобы сработали их сигналы.
+    """
+    with transaction.atomic():
+        _, keys = _delete_reviews(
+            Review.objects.filter(title__in=titles.values("pk"))
+        )
+        _, deleted = titles.delete()
+    bump_versions(Review, *keys)
+    return deleted.get(Title._meta.label, 0)
+
+
+def delete_users(users):
+    """
+    Удаляет пользователей; возвращает число удаленных.
+
+    Их комментарии и отзывы (вместе c комментариями других пользователей
+    к ним) удаляются set-based запросами, пользователи — обычным
+    delete(), который удаляет и остальные связанные строки.
+    """
+    with transaction.atomic():
+        keys = _delete_comments(
+            Comment.objects.filter(author__in=users.values("pk"))
+        )
+        delete_reviews(Review.objects.filter(author__in=users.values("pk")))
+        _, deleted = users.delete()
+    bump_versions(*keys)
+    return deleted.get(User._meta.label, 0)
+
+
+DELETERS = {
+    DeletionJob.TITLE: (Title, delete_titles),
+    DeletionJob.USER: (User, delete_users),
+}
+
+
+def get_target(instance):
+    return (
+        DeletionJob.TITLE if isinstance(instance, Title) else DeletionJob.USER
+    )
+
+
+def delete_instance(instance):
+    model, delete = DELETERS[get_target(instance)]
+    return delete(model.objects.filter(pk=instance.pk))
+
+
+def cascade_size(instance):
+    """Число отзывов и комментариев, удаляемых вместе c объектом."""
+    if isinstance(instance, Title):
+        return (
+            instance.rating_count
+            + Comment.objects.filter(review__title=instance).count()
+        )
+    return (
+        Review.objects.filter(author=instance).count()
+        + Comment.objects.filter(author=instance).count()
+    )
+
+
+def needs_background(instance):
+    return (
+        BACKGROUND_THRESHOLD is not None
+        and cascade_size(instance) > BACKGROUND_THRESHOLD
+    )
+
+
+def queue_deletion(instance):
+    """
+    Ставит удаление в очередь; повторный вызов вернет то же задание.
+
+    Пользователь деактивируется сразу, чтобы до выполнения задания он не
+    мог пользоваться API.
+    """
+    target = get_target(instance)
+    if target == DeletionJob.USER and instance.is_active:
+        instance.is_active = False
+        instance.save(update_fields=("is_active",))
+    job = DeletionJob.objects.filter(
+        target=target,
+        object_id=instance.pk,
+        status__in=(DeletionJob.PENDING, DeletionJob.RUNNING),
+    ).first()
+    return job or DeletionJob.objects.create(
+        target=target, object_id=instance.pk
+    )
+
+
+def requeue_stale():
+    """Возвращает в очередь задания, прерванные аварийной остановкой."""
+    return DeletionJob.objects.filter(status=DeletionJob.RUNNING).update(
+        status=DeletionJob.PENDING
+    )
+
+
+def run_deletion_jobs():
+    """Выполняет задания из очереди; возвращает число выполненных."""
+    done = 0
+    while True:
+        job = DeletionJob.objects.filter(status=DeletionJob.PENDING).first()
+        if job is None:
+            return done
+        claimed = DeletionJob.objects.filter(
+            pk=job.pk, status=DeletionJob.PENDING
+        ).update(status=DeletionJob.RUNNING)
+        if not claimed:
+            continue
+        model, delete = DELETERS[job.target]
+        try:
+            delete(model.objects.filter(pk=job.object_id))
+        except Exception as error:
+            job.status = DeletionJob.FAILED
+            job.error = str(error)
+        else:
+            job.status = DeletionJob.DONE
+            job.error = ""
+            done += 1
+        job.finished = timezone.now()
+        job.save(update_fields=("status", "error", "finished"))
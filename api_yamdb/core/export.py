@@ -0,0 +1,103 @@
+import csv
+import json
+import zlib
+from collections import namedtuple
+
+from core.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+
+CHUNK_SIZE = 2000
+
+# columns: пары (заголовок csv, поле модели); заголовки совпадают c теми,
+# что ожидает import_csv, поэтому выгрузку можно загрузить обратно.
+Export = namedtuple("Export", ("name", "model", "columns"))
+
+EXPORTS = (
+    Export("users", User, (
+        ("id", "id"), ("username", "username"), ("email", "email"),
+        ("role", "role"), ("bio", "bio"), ("first_name", "first_name"),
+        ("last_name", "last_name"),
+    )),
+    Export("category", Category, (
+        ("id", "id"), ("name", "name"), ("slug", "slug"),
+    )),
+    Export("genre", Genre, (
+        ("id", "id"), ("name", "name"), ("slug", "slug"),
+    )),
+    Export("titles", Title, (
+        ("id", "id"), ("name", "name"), ("year", "year"),
+        ("category", "category_id"), ("description", "description"),
+    )),
+    Export("genre_title", Title.genre.through, (
+        ("id", "id"), ("title_id", "title_id"), ("genre_id", "genre_id"),
+    )),
+    Export("review", Review, (
+        ("id", "id"), ("title_id", "title_id"), ("text", "text"),
+        ("author", "author_id"), ("score", "score"),
+        ("pub_date", "pub_date"),
+    )),
+    Export("comments", Comment, (
+        ("id", "id"), ("review_id", "review_id"), ("text", "text"),
+        ("author", "author_id"), ("pub_date", "pub_date"),
+    )),
+)
+EXPORTS_BY_NAME = {export.name: export for export in EXPORTS}
+FORMATS = ("csv", "ndjson")
+
+
+class Echo:
+    """Псевдофайл, возвращающий записанную строку вместо ее хранения."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(export, chunk_size=CHUNK_SIZE):
+    """Строки модели в порядке id, читаемые c сервера порциями."""
+    fields = [field for _, field in export.columns]
+    return (
+        export.model.objects.order_by("id")
+        .values_list(*fields)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _to_text(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(export, chunk_size=CHUNK_SIZE):
+    """Генератор строк csv c заголовком."""
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in export.columns])
+    for row in iter_rows(export, chunk_size):
+        yield writer.writerow([_to_text(value) for value in row])
+
+
+def iter_ndjson(export, chunk_size=CHUNK_SIZE):
+    """Генератор строк NDJSON, по одному объекту на строку."""
+    headers = [header for header, _ in export.columns]
+    for row in iter_rows(export, chunk_size):
+        yield json.dumps(
+            dict(zip(headers, row)), ensure_ascii=False, default=str
+        ) + "\n"
+
+
+def iter_export(export, data_format, chunk_size=CHUNK_SIZE):
+    if data_format == "ndjson":
+        return iter_ndjson(export, chunk_size)
+    return iter_csv(export, chunk_size)
+
+
+def iter_gzip(chunks):
+    """Сжимает поток строк в gzip, не накапливая его в памяти."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,173 @@
+import random
+from collections import Counter
+from itertools import accumulate, islice
+
+from django.db import transaction
+
+from core.cache import bump_versions
+from core.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.services import (
+    recalculate_ratings, recalculate_score_distribution
+)
+
+
+def bulk_insert(model, objects, batch_size):
+    """Пишет объекты из генератора пакетами, не собирая их в память."""
+    objects = iter(objects)
+    created = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return created
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+
+def zipf_weights(size, exponent):
+    """Накопленные веса рангов 1..size по закону Ципфа."""
+    return list(accumulate(rank ** -exponent for rank in range(1, size + 1)))
+
+
+def zipf_counts(generator, items, total, exponent, limit):
+    """
+    Распределяет total событий по items по закону Ципфа.
+
+    Каждому элементу достается не больше limit событий; излишек
+    перераспределяется между оставшимися элементами.
+    """
+    counts = Counter()
+    candidates = list(items)
+    remaining = total
+    while remaining and candidates:
+        counts.update(generator.choices(
+            candidates,
+            cum_weights=zipf_weights(len(candidates), exponent),
+            k=remaining,
+        ))
+        remaining = 0
+        for item in candidates:
+            if counts[item] > limit:
+                remaining += counts[item] - limit
+                counts[item] = limit
+        candidates = [item for item in candidates if counts[item] < limit]
+    return counts
+
+
+def generate(users=1000, categories=10, genres=30, titles=10_000,
+             genres_per_title=2, reviews=100_000, comments=100_000,
+             exponent=1.1, seed=0, prefix="fake", batch_size=5000,
+             log=None):
+    """
+    Создает синтетические данные; возвращает количество созданных строк.
+
+    Отзывы и комментарии распределяются по закону Ципфа, поэтому у
+    небольшой части произведений и отзывов их намного больше, чем у
+    остальных. При одинаковом seed результат повторяется.
+    """
+    generator = random.Random(seed)
+    log = log or (lambda message: None)
+    created = {}
+    last_id = {
+        model: (
+            model.objects.order_by("-id")
+            .values_list("id", flat=True).first() or 0
+        )
+        for model in (User, Category, Genre, Title, Review)
+    }
+
+    def ids(model):
+        return list(
+            model.objects.filter(id__gt=last_id[model])
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    created["users"] = bulk_insert(User, (
+        User(
+            username=f"{prefix}{seed}-user{idx}",
+            email=f"{prefix}{seed}-user{idx}@yamdb.fake",
+        )
+        for idx in range(users)
+    ), batch_size)
+    created["categories"] = bulk_insert(Category, (
+        Category(
+            name=f"Категория {idx}", slug=f"{prefix}{seed}-category-{idx}"
+        )
+        for idx in range(categories)
+    ), batch_size)
+    created["genres"] = bulk_insert(Genre, (
+        Genre(name=f"Жанр {idx}", slug=f"{prefix}{seed}-genre-{idx}")
+        for idx in range(genres)
+    ), batch_size)
+    log(f"Пользователи, категории и жанры: {created}")
+    user_ids = ids(User)
+    category_ids = ids(Category)
+    genre_ids = ids(Genre)
+
+    created["titles"] = bulk_insert(Title, (
+        Title(
+            name=f"Произведение {idx}",
+            year=generator.randint(1900, 2023),
+            category_id=(
+                generator.choice(category_ids) if category_ids else None
+            ),
+            description=f"Описание произведения {idx}",
+        )
+        for idx in range(titles)
+    ), batch_size)
+    title_ids = ids(Title)
+    log(f"Произведения: {created['titles']}")
+
+    per_title = min(genres_per_title, len(genre_ids))
+    created["genre_links"] = bulk_insert(Title.genre.through, (
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in generator.sample(genre_ids, per_title)
+    ), batch_size)
+    log(f"Связи c жанрами: {created['genre_links']}")
+
+    # Ранги популярности назначаются произведениям в случайном порядке.
+    ranked_titles = title_ids[:]
+    generator.shuffle(ranked_titles)
+    # Один пользователь оставляет не больше одного отзыва на произведение.
+    review_counts = zipf_counts(
+        generator, ranked_titles, reviews, exponent, len(user_ids)
+    )
+    created["reviews"] = bulk_insert(Review, (
+        Review(
+            title_id=title_id,
+            author_id=author_id,
+            text=f"Отзыв на произведение {title_id}",
+            score=generator.randint(1, 10),
+        )
+        for title_id, count in review_counts.items()
+        for author_id in generator.sample(user_ids, count)
+    ), batch_size)
+    log(f"Отзывы: {created['reviews']}")
+
+    review_ids = ids(Review)
+    generator.shuffle(review_ids)
+    comment_reviews = []
+    if review_ids and user_ids and comments:
+        comment_reviews = generator.choices(
+            review_ids,
+            cum_weights=zipf_weights(len(review_ids), exponent),
+            k=comments,
+        )
+    created["comments"] = bulk_insert(Comment, (
+        Comment(
+            review_id=review_id,
+            author_id=generator.choice(user_ids),
+            text=f"Комментарий к отзыву {review_id}",
+        )
+        for review_id in comment_reviews
+    ), batch_size)
+    log(f"Комментарии: {created['comments']}")
+
+    new_titles = Title.objects.filter(id__gt=last_id[Title])
+    recalculate_ratings(new_titles)
+    recalculate_score_distribution(new_titles, batch_size)
+    bump_versions(Category, Genre, Review, Title)
+    return created
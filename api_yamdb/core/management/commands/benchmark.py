@@ -0,0 +1,227 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.fake_data import generate
+from core.models import User
+from reviews.leaderboard import refresh_leaderboards
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет временную БД SQLite синтетическими данными и замеряет "
+        "задержку, число запросов и пиковую память эндпоинтов API"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=100_000)
+        parser.add_argument("--reviews", type=int, default=1_000_000)
+        parser.add_argument("--comments", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Количество замеров на эндпоинт",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark.json",
+            help="Файл для JSON-отчета",
+        )
+        parser.add_argument(
+            "--baseline", help="JSON-отчет, c которым сравнить результаты"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Допустимое относительное ухудшение p95",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations должен быть положительным")
+        creation = connection.creation
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        old_test_name = test_settings.get("NAME")
+        # close() не закрывает соединение c БД в памяти (так работают
+        # тесты): оно откладывается до удаления временной БД, иначе
+        # данные и замеры попали бы в него.
+        kept_connection = None
+        if connection.is_in_memory_db():
+            kept_connection, connection.connection = (
+                connection.connection, None
+            )
+        directory = tempfile.mkdtemp(prefix="yamdb-benchmark-")
+        test_settings["NAME"] = os.path.join(directory, "benchmark.sqlite3")
+        creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            started = time.perf_counter()
+            generate(
+                users=options["users"],
+                titles=options["titles"],
+                reviews=options["reviews"],
+                comments=options["comments"],
+            )
+            refresh_leaderboards(full=True)
+            self.stdout.write(
+                f"Данные созданы за {time.perf_counter() - started:.1f} c"
+            )
+            report = {
+                "created": datetime.now().isoformat(),
+                "dataset": {
+                    "titles": Title.objects.count(),
+                    "reviews": Review.objects.count(),
+                    "comments": Comment.objects.count(),
+                    "users": User.objects.count(),
+                },
+                "endpoints": self.run_endpoints(options["iterations"]),
+            }
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
+            os.rmdir(directory)
+            test_settings["NAME"] = old_test_name
+            if kept_connection is not None:
+                connection.connection = kept_connection
+        with open(options["output"], "w", encoding="utf8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Отчет сохранен в {options['output']}")
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["tolerance"])
+
+    def get_endpoints(self):
+        title = Title.objects.order_by("-rating_count", "id").first()
+        review = (
+            Review.objects.filter(comments__isnull=False)
+            .order_by("id").first()
+        )
+        category = Category.objects.order_by("id").first()
+        genre = Genre.objects.order_by("id").first()
+        user = User.objects.order_by("id").first()
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        middle_page = max(1, Title.objects.count() // page_size // 2)
+        return {
+            "categories-list": "/api/v1/categories/",
+            "genres-list": "/api/v1/genres/",
+            "titles-list": "/api/v1/titles/",
+            "titles-list-deep": f"/api/v1/titles/?page={middle_page}",
+            "titles-list-by-rating": "/api/v1/titles/?ordering=-rating",
+            "titles-list-filtered": (
+                f"/api/v1/titles/?genre={genre.slug}"
+                f"&category={category.slug}"
+            ),
+            "titles-search": "/api/v1/titles/?q=Произведение 12",
+            "titles-autocomplete": (
+                "/api/v1/titles/autocomplete/?prefix=Произведение 12"
+            ),
+            "titles-top": "/api/v1/titles/top/",
+            "titles-top-genre": f"/api/v1/titles/top/?genre={genre.slug}",
+            "titles-detail": f"/api/v1/titles/{title.id}/",
+            "reviews-list": f"/api/v1/titles/{title.id}/reviews/",
+            "reviews-detail": (
+                f"/api/v1/titles/{review.title_id}/reviews/{review.id}/"
+            ),
+            "comments-list": (
+                f"/api/v1/titles/{review.title_id}/reviews/{review.id}"
+                "/comments/"
+            ),
+            "users-list": "/api/v1/users/",
+            "users-detail": f"/api/v1/users/{user.username}/",
+            "users-me": "/api/v1/users/me/",
+        }
+
+    def run_endpoints(self, iterations):
+        admin = User.objects.create_user(
+            username="benchmark-admin",
+            email="benchmark-admin@yamdb.fake",
+            role="admin",
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}"
+        )
+        results = {}
+        for name, url in self.get_endpoints().items():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(
+                    f"{url}: ответ {response.status_code} вместо 200"
+                )
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            # Журнал запросов ограничен, и после заполнения БД он полон.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                client.get(url)
+            # captured_queries читает журнал лениво, a следующий запрос
+            # его очищает.
+            queries = len(context.captured_queries)
+            tracemalloc.start()
+            client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {
+                "url": url,
+                "p50_ms": round(statistics.median(timings), 3),
+                "p95_ms": round(percentile(timings, 95), 3),
+                "queries": queries,
+                "peak_memory_kb": round(peak / 1024, 1),
+            }
+            self.stdout.write(
+                f"{name}: p50 {results[name]['p50_ms']} мс, "
+                f"p95 {results[name]['p95_ms']} мс, "
+                f"запросов {results[name]['queries']}, "
+                f"память {results[name]['peak_memory_kb']} КБ"
+            )
+        return results
+
+    def compare(self, report, baseline_path, tolerance):
+        with open(baseline_path, encoding="utf8") as baseline_file:
+            baseline = json.load(baseline_file)["endpoints"]
+        regressions = []
+        for name, result in report["endpoints"].items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            if result["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{name}: запросов {previous['queries']} -> "
+                    f"{result['queries']}"
+                )
+            if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: p95 {previous['p95_ms']} -> "
+                    f"{result['p95_ms']} мс"
+                )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions:
+            raise CommandError(
+                f"Обнаружено ухудшений производительности: {len(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Ухудшений не обнаружено"))
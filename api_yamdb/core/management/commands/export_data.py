@@ -0,0 +1,52 @@
+import gzip
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.export import CHUNK_SIZE, EXPORTS, FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Выгружает данные из БД в файлах того же формата, что и import_csv"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Каталог для выгрузки")
+        parser.add_argument(
+            "--format", choices=FORMATS, default="csv", dest="data_format"
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Сжимать файлы в gzip"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Количество строк, читаемых из БД за раз",
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options["path"], exist_ok=True)
+        for export in EXPORTS:
+            filename = f"{export.name}.{options['data_format']}"
+            opener = open
+            if options["gzip"]:
+                filename += ".gz"
+                opener = gzip.open
+            started = time.perf_counter()
+            rows = 0
+            with opener(
+                os.path.join(options["path"], filename), "wt",
+                encoding="utf8", newline="",
+            ) as output:
+                for line in iter_export(
+                    export, options["data_format"], options["chunk_size"]
+                ):
+                    output.write(line)
+                    rows += 1
+            if options["data_format"] == "csv":
+                rows -= 1
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{filename}: выгружено {rows} за {elapsed:.2f} c"
+            )
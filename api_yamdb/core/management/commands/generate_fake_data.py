@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.fake_data import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Создает синтетические данные для нагрузочного тестирования; "
+        "отзывы и комментарии распределены по закону Ципфа"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument("--titles", type=int, default=10_000)
+        parser.add_argument("--genres-per-title", type=int, default=2)
+        parser.add_argument("--reviews", type=int, default=100_000)
+        parser.add_argument("--comments", type=int, default=100_000)
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Показатель распределения Ципфа для отзывов и комментариев",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix",
+            default="fake",
+            help="Префикс имен пользователей и slug'ов",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = generate(
+            users=options["users"],
+            categories=options["categories"],
+            genres=options["genres"],
+            titles=options["titles"],
+            genres_per_title=options["genres_per_title"],
+            reviews=options["reviews"],
+            comments=options["comments"],
+            exponent=options["zipf"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - started
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано строк: {total} за {elapsed:.1f} c "
+            f"({total / elapsed if elapsed else total:.0f} строк/c)"
+        ))
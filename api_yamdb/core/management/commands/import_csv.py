@@ -1,72 +1,354 @@
-from django.core.management.base import BaseCommand
-from core.models import Category, Genre, Title, User, Review, Comment
 import csv
+import json
 import os
+import time
+from collections import namedtuple
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.cache import bump_all_versions
+from core.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.services import (
+    recalculate_ratings, recalculate_score_distribution
+)
+
+
+def build_user(row):
+    return User(
+        id=row["id"],
+        username=row["username"],
+        email=row["email"],
+        role=row["role"],
+        bio=row.get("bio") or None,
+        first_name=row.get("first_name") or "",
+        last_name=row.get("last_name") or "",
+    )
+
+
+def build_category(row):
+    return Category(id=row["id"], name=row["name"], slug=row["slug"])
+
+
+def build_genre(row):
+    return Genre(id=row["id"], name=row["name"], slug=row["slug"])
+
+
+def build_title(row):
+    return Title(
+        id=row["id"],
+        name=row["name"],
+        year=row["year"],
+        category_id=row["category"] or None,
+        description=row.get("description") or None,
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row["id"],
+        title_id=row["title_id"],
+        text=row["text"],
+        author_id=row["author"],
+        score=row["score"],
+        pub_date=row["pub_date"],
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row["id"],
+        review_id=row["review_id"],
+        text=row["text"],
+        author_id=row["author"],
+        pub_date=row["pub_date"],
+    )
+
+
+def build_genre_title(row):
+    return Title.genre.through(
+        title_id=row["title_id"], genre_id=row["genre_id"]
+    )
+
+
+# foreign_keys: {поле csv: модель}; ignore_conflicts: строки, нарушающие
+# уникальность, молча пропускаются базой (INSERT OR IGNORE).
+Source = namedtuple(
+    "Source",
+    ("filename", "model", "build", "foreign_keys", "ignore_conflicts"),
+    defaults=({}, False),
+)
+
+# Источники в порядке зависимостей между моделями.
+SOURCES = (
+    Source("users.csv", User, build_user),
+    Source("category.csv", Category, build_category),
+    Source("genre.csv", Genre, build_genre),
+    Source("titles.csv", Title, build_title, {"category": Category}),
+    Source(
+        "genre_title.csv", Title.genre.through, build_genre_title,
+        {"title_id": Title, "genre_id": Genre}, ignore_conflicts=True,
+    ),
+    Source(
+        "review.csv", Review, build_review,
+        {"title_id": Title, "author": User},
+    ),
+    Source(
+        "comments.csv", Comment, build_comment,
+        {"review_id": Review, "author": User},
+    ),
+)
+
+
+def upsert(model, objects, batch_size, header, update=True):
+    """
+    Вставляет объекты, обновляя уже существующие строки c тем же id.
+
+    При update=False существующие строки пропускаются. В отличие от
+    bulk_create значения из csv пишутся как есть: pre_save вызывается
+    только для пустых полей, и auto_now_add не заменяет pub_date.
+
+    Django 3.2 не поддерживает bulk_create(update_conflicts=...), поэтому
+    используется INSERT ... ON CONFLICT (id) DO UPDATE (SQLite 3.24+).
+    Обновляются только поля, для которых в csv есть столбец (header), —
+    пароль, флаги и счетчики существующих строк не затираются. Новым
+    строкам значения по умолчанию нужны только для полей NOT NULL: у
+    столбцов, созданных Django, нет значений по умолчанию в БД.
+    """
+    provided = [
+        field for field in model._meta.concrete_fields
+        if field.primary_key or field.name in header
+        or field.attname in header
+    ]
+    fields = provided + [
+        field for field in model._meta.concrete_fields
+        if field not in provided and not field.null
+    ]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in fields)
+    updates = ", ".join(
+        f"{quote(field.column)} = excluded.{quote(field.column)}"
+        for field in provided if not field.primary_key
+    )
+    on_conflict = (
+        f"DO UPDATE SET {updates}" if update and updates else "DO NOTHING"
+    )
+    batch_size = min(
+        batch_size, connection.ops.bulk_batch_size(fields, objects) or 1
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(objects), batch_size):
+            batch = objects[start:start + batch_size]
+            placeholders = ", ".join(
+                "(" + ", ".join(["%s"] * len(fields)) + ")" for _ in batch
+            )
+            params = []
+            for obj in batch:
+                for field in fields:
+                    value = getattr(obj, field.attname)
+                    if value is None:
+                        value = field.pre_save(obj, add=True)
+                    params.append(field.get_db_prep_save(value, connection))
+            cursor.execute(
+                f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+                f"VALUES {placeholders} "
+                f"ON CONFLICT ({quote(model._meta.pk.column)}) {on_conflict}",
+                params,
+            )
+
+
+def read_records(csvfile, offset):
+    """
+    Читает строки csv, начиная c байтового смещения offset.
+
+    Возвращает заголовок и генератор пар (строка, смещение после нее),
+    по которым можно продолжить прерванный импорт.
+    """
+    header = next(csv.reader([csvfile.readline().decode("utf8")]))
+    position = max(offset, csvfile.tell())
+    csvfile.seek(position)
+
+    def lines():
+        nonlocal position
+        for line in iter(csvfile.readline, b""):
+            position += len(line)
+            yield line.decode("utf8")
+
+    def records():
+        for values in csv.reader(lines()):
+            yield dict(zip(header, values)), position
+
+    return header, records()
 
 
 class Command(BaseCommand):
-    help = ""
+    help = "Загружает данные из csv-файлов в БД пакетами"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=os.path.join(settings.BASE_DIR, "static", "data"),
+            help="Каталог c csv-файлами",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество строк в одном INSERT",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Обновлять уже существующие строки вместо пропуска",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "Файл контрольной точки; по умолчанию "
+                ".import_csv_checkpoint.json в каталоге --path"
+            ),
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Игнорировать контрольную точку прерванного импорта",
+        )
 
     def handle(self, *args, **options):
-        os.chdir("static/data")
-        with open("users.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                User.objects.get_or_create(
-                    id=row[0],
-                    username=row[1],
-                    email=row[2],
-                    role=row[3],
-                )
-        with open("category.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                Category.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    slug=row[2],
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным")
+        self.batch_size = options["batch_size"]
+        self.upsert = options["upsert"]
+        self.known_ids = {}
+        self.checkpoint_path = options["checkpoint"] or os.path.join(
+            options["path"], ".import_csv_checkpoint.json"
+        )
+        self.checkpoint = {}
+        if not options["restart"]:
+            self.checkpoint = self.load_checkpoint()
+        for source in SOURCES:
+            path = os.path.join(options["path"], source.filename)
+            if not os.path.exists(path):
+                self.stdout.write(
+                    f"{source.filename}: файл не найден, пропущен"
                 )
-        with open("genre.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                Genre.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    slug=row[2],
-                )
-        with open("titles.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                Title.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    year=row[2],
-                    category=Category.objects.get(id=row[3]),
-                )
-        with open("review.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                Review.objects.get_or_create(
-                    id=row[0],
-                    title=Title.objects.get(id=row[1]),
-                    text=row[2],
-                    author=User.objects.get(id=row[3]),
-                    score=row[4],
-                    pub_date=row[5],
+                continue
+            self.import_file(path, source)
+        recalculate_ratings()
+        recalculate_score_distribution()
+        bump_all_versions(Category, Genre, Review, Comment, Title, User)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, encoding="utf8") as checkpoint:
+            return json.load(checkpoint)
+
+    def save_checkpoint(self):
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf8") as checkpoint:
+            json.dump(self.checkpoint, checkpoint)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def get_start_offset(self, path):
+        """Смещение, c которого продолжается импорт неизмененного файла."""
+        saved = self.checkpoint.get(os.path.basename(path))
+        stat = os.stat(path)
+        if (
+            saved
+            and saved["size"] == stat.st_size
+            and saved["mtime"] == stat.st_mtime
+        ):
+            return saved["offset"]
+        return 0
+
+    def get_known_ids(self, model):
+        """Множество существующих id модели, загружаемое один раз."""
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list("id", flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def has_foreign_keys(self, row, foreign_keys):
+        for column, model in foreign_keys.items():
+            value = row[column]
+            if value and int(value) not in self.get_known_ids(model):
+                return False
+        return True
+
+    def is_new_row(self, row, source):
+        if not self.has_foreign_keys(row, source.foreign_keys):
+            return False
+        if source.ignore_conflicts or self.upsert:
+            return True
+        return int(row["id"]) not in self.get_known_ids(source.model)
+
+    def write_batch(self, model, objects, source, header):
+        with transaction.atomic():
+            if not source.ignore_conflicts:
+                upsert(
+                    model, objects, self.batch_size, header,
+                    update=self.upsert,
                 )
-        with open("comments.csv", encoding="utf8") as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)
-            for row in reader:
-                Comment.objects.get_or_create(
-                    id=row[0],
-                    review=Review.objects.get(id=row[1]),
-                    text=row[2],
-                    author=User.objects.get(id=row[3]),
-                    pub_date=row[4],
+            else:
+                model.objects.bulk_create(
+                    objects,
+                    batch_size=self.batch_size,
+                    ignore_conflicts=True,
                 )
+
+    def import_file(self, path, source):
+        filename = os.path.basename(path)
+        model = source.model
+        loaded = skipped = 0
+        started = time.perf_counter()
+        stat = os.stat(path)
+        offset = self.get_start_offset(path)
+        if offset:
+            self.stdout.write(
+                f"{filename}: продолжение c позиции {offset} байт"
+            )
+        if source.ignore_conflicts:
+            rows_before = model.objects.count()
+        with open(path, "rb") as csvfile:
+            header, records = read_records(csvfile, offset)
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                objects = []
+                for row, _ in batch:
+                    if self.is_new_row(row, source):
+                        objects.append(source.build(row))
+                    else:
+                        skipped += 1
+                self.write_batch(model, objects, source, header)
+                if not source.ignore_conflicts:
+                    self.get_known_ids(model).update(
+                        int(obj.id) for obj in objects
+                    )
+                loaded += len(objects)
+                last_row, offset = batch[-1]
+                self.checkpoint[filename] = {
+                    "offset": offset,
+                    "last_id": last_row.get("id"),
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                }
+                self.save_checkpoint()
+        if source.ignore_conflicts:
+            inserted = model.objects.count() - rows_before
+            skipped += loaded - inserted
+            loaded = inserted
+        elapsed = time.perf_counter() - started
+        rate = loaded / elapsed if elapsed else loaded
+        self.stdout.write(
+            f"{filename}: загружено {loaded}, пропущено {skipped} "
+            f"за {elapsed:.2f} c ({rate:.0f} строк/c)"
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import bump_all_versions
+from reviews.models import Title
+from reviews.services import recalculate_score_distribution
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает распределение оценок произведений по отзывам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Количество произведений в одном UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным")
+        updated = recalculate_score_distribution(
+            batch_size=options["batch_size"]
+        )
+        # UPDATE не вызывает сигналов: ответы o произведениях сбрасываются
+        # здесь, включая метки отдельных произведений.
+        bump_all_versions(Title)
+        self.stdout.write(
+            self.style.SUCCESS(f"Произведений c отзывами: {updated}")
+        )
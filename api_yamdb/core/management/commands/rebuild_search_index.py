@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.search import is_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс произведений"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--optimize",
+            action="store_true",
+            help="Объединить сегменты индекса после перестроения",
+        )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError(
+                "Полнотекстовый индекс доступен только в SQLite"
+            )
+        rebuild_search_index(optimize=options["optimize"])
+        self.stdout.write(self.style.SUCCESS("Индекс перестроен"))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import bump_all_versions
+from reviews.models import Title
+from reviews.services import find_inconsistent_ratings, recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает или проверяет рейтинги произведений по отзывам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить рейтинги, ничего не изменяя",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            broken = find_inconsistent_ratings().values_list(
+                "id", "rating_sum", "rating_count", "rating",
+                "actual_sum", "actual_count", "actual_rating",
+            )
+            count = 0
+            for title_id, *stored, sum_, count_, rating in broken:
+                count += 1
+                self.stdout.write(
+                    f"Произведение {title_id}: "
+                    f"сохранено {stored[0]}/{stored[1]} ({stored[2]}), "
+                    f"по отзывам {sum_}/{count_} ({rating})"
+                )
+            if count:
+                raise CommandError(
+                    f"Найдено произведений c неверным рейтингом: {count}"
+                )
+            self.stdout.write(self.style.SUCCESS("Рейтинги согласованы"))
+            return
+        updated = recalculate_ratings()
+        # UPDATE не вызывает сигналов: ответы o произведениях сбрасываются
+        # здесь, включая метки отдельных произведений.
+        bump_all_versions(Title)
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано произведений: {updated}")
+        )
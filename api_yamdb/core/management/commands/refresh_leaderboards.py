@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboard import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает рейтинги лучших произведений, затронутые "
+        "изменениями после прошлого запуска"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать все рейтинги",
+        )
+
+    def handle(self, *args, **options):
+        refresh = refresh_leaderboards(full=options["full"])
+        kind = "полностью" if refresh.full else "частично"
+        self.stdout.write(self.style.SUCCESS(
+            f"Рейтинги пересчитаны {kind}: {refresh.scopes}"
+        ))
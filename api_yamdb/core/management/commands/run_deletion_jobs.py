@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.deletion import requeue_stale, run_deletion_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет отложенные удаления произведений и пользователей. "
+        "Рассчитана на один запущенный экземпляр: при старте возвращает "
+        "в очередь прерванные задания"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза между проверками пустой очереди, в секундах",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить текущую очередь и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        requeue_stale()
+        while True:
+            done = run_deletion_jobs()
+            if done:
+                self.stdout.write(f"Выполнено удалений: {done}")
+            if options["once"]:
+                break
+            if not done:
+                time.sleep(options["interval"])
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import EmailSender
+
+
+class Command(BaseCommand):
+    help = (
+        "Отправляет письма из очереди. Рассчитана на один запущенный "
+        "экземпляр: при старте возвращает в очередь зависшие письма"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Количество писем, отправляемых через одно соединение",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Количество потоков"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза между проверками пустой очереди, в секундах",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Отправить текущую очередь и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        sender = EmailSender(workers=options["workers"])
+        sender.requeue_stale()
+        try:
+            while True:
+                sent = sender.drain(options["batch_size"])
+                if sent:
+                    self.stdout.write(f"Отправлено писем: {sent}")
+                if options["once"]:
+                    break
+                if not sent:
+                    time.sleep(options["interval"])
+        finally:
+            sender.close()
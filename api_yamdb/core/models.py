@@ -35,3 +35,82 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == "moderator"
+
+
+class OutgoingEmail(models.Model):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (SENDING, "Отправляется"),
+        (SENT, "Отправлено"),
+        (FAILED, "Ошибка"),
+    )
+
+    email = models.EmailField("Получатель", max_length=254)
+    subject = models.CharField("Тема", max_length=255)
+    template = models.CharField("Шаблон", max_length=255)
+    context = models.JSONField("Контекст шаблона", default=dict)
+    status = models.CharField(
+        "Статус", max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    error = models.TextField("Последняя ошибка", blank=True)
+    created = models.DateTimeField("Создано", auto_now_add=True)
+    sent = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        ordering = ["id"]
+        indexes = (
+            models.Index(
+                fields=["status", "id"], name="outgoing_email_status_idx"
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.subject} для {self.email}"
+
+
+class DeletionJob(models.Model):
+    TITLE = "title"
+    USER = "user"
+    TARGETS = (
+        (TITLE, "Произведение"),
+        (USER, "Пользователь"),
+    )
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнено"),
+        (FAILED, "Ошибка"),
+    )
+
+    target = models.CharField("Объект", max_length=10, choices=TARGETS)
+    object_id = models.PositiveIntegerField("id объекта")
+    status = models.CharField(
+        "Статус", max_length=10, choices=STATUSES, default=PENDING
+    )
+    error = models.TextField("Ошибка", blank=True)
+    created = models.DateTimeField("Создано", auto_now_add=True)
+    finished = models.DateTimeField("Завершено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Задание на удаление"
+        verbose_name_plural = "Задания на удаление"
+        ordering = ["id"]
+        indexes = (
+            models.Index(
+                fields=["status", "id"], name="deletion_job_status_idx"
+            ),
+        )
+
+    def __str__(self):
+        return f"Удаление {self.target} {self.object_id}"
@@ -1,7 +1,17 @@
 import random
 import string
-from django.core.mail import send_mail
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
 from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+FROM_EMAIL = "yamdb@yamdb.com"
+MAX_SEND_ATTEMPTS = 5
 
 
 def generate_confirmation_code(length=6):
@@ -13,12 +23,145 @@ def generate_confirmation_code(length=6):
     return confirmation_code
 
 
-def send_confirmation_email(email, confirmation_code):
-    """Отправляет email с кодом подтверждения на указанный адрес."""
-    subject = "Подтверждение регистрации"
-    message = render_to_string(
-        "confirmation_email.html", {"code": confirmation_code}
+def queue_confirmation_email(email, confirmation_code):
+    """Ставит email c кодом подтверждения в очередь на отправку."""
+    return OutgoingEmail.objects.create(
+        email=email,
+        subject="Подтверждение регистрации",
+        template="confirmation_email.html",
+        context={"code": confirmation_code},
+    )
+
+
+def build_message(outgoing_email, connection=None):
+    """Собирает письмо из записи очереди."""
+    return EmailMessage(
+        outgoing_email.subject,
+        render_to_string(outgoing_email.template, outgoing_email.context),
+        FROM_EMAIL,
+        [outgoing_email.email],
+        connection=connection,
     )
-    from_email = "yamdb@yamdb.com"
-    recipient_list = [email]
-    send_mail(subject, message, from_email, recipient_list)
+
+
+class EmailSender:
+    """
+    Отправляет пачки писем из очереди в пуле потоков.
+
+    Пул создается один раз, и каждый его поток открывает соединение c
+    почтовым сервером и переиспользует его для всех своих пачек во всех
+    вызовах drain. После ошибки отправки соединение закрывается и при
+    следующей пачке открывается заново.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        if getattr(self.local, "connection", None) is None:
+            connection = get_connection()
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return self.local.connection
+
+    def discard_connection(self):
+        connection = self.local.connection
+        self.local.connection = None
+        with self.lock:
+            self.connections.remove(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def send_batch(self, outgoing_emails):
+        connection = self.get_connection()
+        messages = [
+            build_message(outgoing_email, connection)
+            for outgoing_email in outgoing_emails
+        ]
+        try:
+            connection.send_messages(messages)
+        except Exception:
+            self.discard_connection()
+            raise
+
+    def claim_batch(self, batch_size, after_id=0):
+        ids = list(
+            OutgoingEmail.objects.filter(
+                status=OutgoingEmail.PENDING, id__gt=after_id
+            )
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            id__in=ids, status=OutgoingEmail.PENDING
+        ).update(status=OutgoingEmail.SENDING)
+        return list(
+            OutgoingEmail.objects.filter(
+                id__in=ids, status=OutgoingEmail.SENDING
+            )
+        )
+
+    def finish_batch(self, outgoing_emails, error=None):
+        ids = [outgoing_email.id for outgoing_email in outgoing_emails]
+        if error is None:
+            OutgoingEmail.objects.filter(id__in=ids).update(
+                status=OutgoingEmail.SENT,
+                sent=timezone.now(),
+                attempts=F("attempts") + 1,
+                error="",
+            )
+            return
+        queryset = OutgoingEmail.objects.filter(id__in=ids)
+        queryset.filter(attempts__gte=MAX_SEND_ATTEMPTS - 1).update(
+            status=OutgoingEmail.FAILED
+        )
+        queryset.filter(attempts__lt=MAX_SEND_ATTEMPTS - 1).update(
+            status=OutgoingEmail.PENDING
+        )
+        queryset.update(attempts=F("attempts") + 1, error=str(error))
+
+    def requeue_stale(self):
+        """Возвращает в очередь письма, зависшие при аварийной остановке."""
+        return OutgoingEmail.objects.filter(
+            status=OutgoingEmail.SENDING
+        ).update(status=OutgoingEmail.PENDING)
+
+    def drain(self, batch_size=100):
+        """
+        Отправляет письма, стоящие в очереди; возвращает число отправленных.
+
+        За один вызов каждое письмо пробуется не более одного раза.
+        """
+        sent = 0
+        last_id = 0
+        while True:
+            batches = []
+            for _ in range(self.workers):
+                batch = self.claim_batch(batch_size, last_id)
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                batches.append(
+                    (batch, self.executor.submit(self.send_batch, batch))
+                )
+            if not batches:
+                return sent
+            for batch, future in batches:
+                error = future.exception()
+                self.finish_batch(batch, error)
+                if error is None:
+                    sent += len(batch)
+
+    def close(self):
+        self.executor.shutdown()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
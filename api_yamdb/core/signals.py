@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .cache import bump_versions
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Сбрасывает кешированного пользователя при изменении или удалении.
+
+    Запись удаляется и после COMMIT, чтобы параллельный запрос не оставил
+    в кеше прочитанную до него версию.
+    """
+    user_id = str(instance.pk)
+    user_cache.delete(user_id)
+    transaction.on_commit(lambda: user_cache.delete(user_id))
+    bump_versions(User)
+
+
+@receiver(post_migrate)
+def clear_user_cache(sender, **kwargs):
+    """Очищает кеш после migrate и flush, меняющих таблицы целиком."""
+    user_cache.clear()
@@ -1,10 +1,19 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Title, Review
+from .models import Category, Comment, Genre, GenreTitle, Title, Review
+
+
+class GenreTitleInline(admin.TabularInline):
+    model = GenreTitle
+    extra = 1
+
+
+class TitleAdmin(admin.ModelAdmin):
+    inlines = (GenreTitleInline,)
 
 
 admin.site.register(Genre)
 admin.site.register(Category)
-admin.site.register(Title)
+admin.site.register(Title, TitleAdmin)
 admin.site.register(Review)
 admin.site.register(Comment)
@@ -0,0 +1,292 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Title
+
+# Верхняя граница для всех строк, начинающихся c заданного префикса.
+MAX_CHAR = chr(0x10FFFF)
+
+# Наибольшее число подсказок в одном ответе.
+MAX_SUGGESTIONS = 50
+
+
+def normalize(text):
+    """Приводит название к виду, по которому ищется префикс."""
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+def prefixes(key):
+    return (key[:length] for length in range(1, len(key) + 1))
+
+
+class TitleSnapshot:
+    """
+    Отсортированные по нормализованным названиям произведения и заранее
+    вычисленные самые популярные из них для широких префиксов.
+
+    Для каждого префикса, под который попадает больше scan_limit
+    произведений, хранится до capacity лучших id в порядке выдачи, и
+    ответ на него не просматривает диапазон. Список, в котором после
+    изменений осталось меньше половины capacity, вычисляется заново.
+    Узкие префиксы просматриваются целиком: в них не больше scan_limit
+    произведений.
+    """
+
+    def __init__(self, rows, scan_limit=256, capacity=2 * MAX_SUGGESTIONS):
+        self.scan_limit = scan_limit
+        self.capacity = capacity
+        # keys: отсортированные пары (нормализованное название, id);
+        # titles: id -> [нормализованное название, название, популярность];
+        # top: широкий префикс -> лучшие id.
+        self.titles = {
+            title_id: [normalize(name), name, popularity]
+            for title_id, name, popularity in rows
+        }
+        self.keys = sorted(
+            (key, title_id) for title_id, (key, _, _) in self.titles.items()
+        )
+        self.top = {}
+        self._collect(0, len(self.keys), 0)
+
+    @classmethod
+    def load(cls, **kwargs):
+        return cls(
+            Title.objects.values_list("id", "name", "rating_count")
+            .iterator(),
+            **kwargs,
+        )
+
+    def order(self, title_id):
+        key, _, popularity = self.titles[title_id]
+        return -popularity, key, title_id
+
+    def _collect(self, start, stop, depth):
+        """
+        Лучшие id диапазона keys[start:stop] c общим префиксом длины depth.
+
+        Лучшие в широком диапазоне выбираются из лучших его поддиапазонов
+        по следующему символу, поэтому построение проходит keys один раз.
+        """
+        if stop - start <= self.scan_limit:
+            return self._scan(start, stop, self.capacity)
+        candidates = []
+        index = start
+        while index < stop:
+            key, title_id = self.keys[index]
+            if len(key) <= depth:
+                candidates.append(title_id)
+                index += 1
+                continue
+            end = bisect_left(
+                self.keys, (key[:depth + 1] + MAX_CHAR,), index, stop
+            )
+            candidates += self._collect(index, end, depth + 1)
+            index = end
+        best = heapq.nsmallest(self.capacity, candidates, key=self.order)
+        if depth:
+            self.top[self.keys[start][0][:depth]] = best
+        return best
+
+    def _range(self, prefix):
+        start = bisect_left(self.keys, (prefix,))
+        return start, bisect_left(self.keys, (prefix + MAX_CHAR,), start)
+
+    def _scan(self, start, stop, limit):
+        ids = (self.keys[index][1] for index in range(start, stop))
+        return heapq.nsmallest(limit, ids, key=self.order)
+
+    def suggest(self, prefix, limit):
+        ids = self.top.get(prefix)
+        if ids is None or len(ids) < limit:
+            ids = self._scan(*self._range(prefix), limit)
+        return [
+            {"id": title_id, "name": self.titles[title_id][1]}
+            for title_id in ids[:limit]
+        ]
+
+    def set(self, title_id, name, popularity):
+        key = normalize(name)
+        title = self.titles.get(title_id)
+        if title is not None and title[0] != key:
+            self.delete(title_id)
+            title = None
+        if title is None:
+            self.titles[title_id] = [key, name, popularity]
+            insort(self.keys, (key, title_id))
+        else:
+            title[1:] = [name, popularity]
+        self._place(title_id)
+
+    def add_popularity(self, title_id, delta):
+        title = self.titles.get(title_id)
+        if title is not None:
+            title[2] += delta
+            self._place(title_id)
+
+    def delete(self, title_id):
+        title = self.titles.pop(title_id, None)
+        if title is None:
+            return
+        del self.keys[bisect_left(self.keys, (title[0], title_id))]
+        for prefix in prefixes(title[0]):
+            best = self.top.get(prefix)
+            if best is not None:
+                if title_id in best:
+                    best.remove(title_id)
+                self._refill(prefix)
+
+    def _place(self, title_id):
+        """
+        Ставит произведение на его место в списках лучших.
+
+        Список остается точным: произведение, оказавшееся в нем последним,
+        удаляется, если в диапазоне есть не попавшие в список, — любое из
+        них может быть лучше.
+        """
+        for prefix in prefixes(self.titles[title_id][0]):
+            best = self.top.get(prefix)
+            if best is None:
+                continue
+            if title_id in best:
+                best.remove(title_id)
+            self._insert(best, title_id)
+            del best[self.capacity:]
+            if best[-1] == title_id:
+                start, stop = self._range(prefix)
+                if stop - start > len(best):
+                    best.pop()
+                    self._refill(prefix)
+
+    def _insert(self, best, title_id):
+        order = self.order(title_id)
+        low, high = 0, len(best)
+        while low < high:
+            middle = (low + high) // 2
+            if self.order(best[middle]) < order:
+                low = middle + 1
+            else:
+                high = middle
+        best.insert(low, title_id)
+
+    def _refill(self, prefix):
+        start, stop = self._range(prefix)
+        if stop - start <= self.scan_limit:
+            del self.top[prefix]
+        elif len(self.top[prefix]) < self.capacity // 2:
+            self.top[prefix] = self._scan(start, stop, self.capacity)
+
+
+class TitleIndex:
+    """
+    Индекс произведений для подсказок по началу названия.
+
+    Строится при первом обращении и дальше обновляется сигналами.
+    Индекс локален для процесса, поэтому изменения из других процессов
+    появляются в нем после перестройки, не позже чем через ttl секунд.
+    Перестройка идет в фоновом потоке: пока она не закончится, запросы
+    отвечают из прежнего индекса, а изменения, сделанные за время
+    перестройки, переносятся в новый.
+    """
+
+    def __init__(self, ttl, **snapshot_options):
+        self.ttl = ttl
+        self.snapshot_options = snapshot_options
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.rebuild_thread = None
+        self._reset()
+
+    def clear(self):
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.snapshot = None
+        self.expires = None
+        self.touched = None
+        self.generation += 1
+
+    def _changed(self, title_id):
+        if self.touched is not None:
+            self.touched.add(title_id)
+        return self.snapshot
+
+    def update(self, title_id, name, popularity):
+        with self.lock:
+            snapshot = self._changed(title_id)
+            if snapshot is not None:
+                snapshot.set(title_id, name, popularity)
+
+    def remove(self, title_id):
+        with self.lock:
+            snapshot = self._changed(title_id)
+            if snapshot is not None:
+                snapshot.delete(title_id)
+
+    def add_popularity(self, title_id, delta):
+        with self.lock:
+            snapshot = self._changed(title_id)
+            if snapshot is not None:
+                snapshot.add_popularity(title_id, delta)
+
+    def _ensure_built(self):
+        """
+        Строит индекс при первом обращении; для устаревшего возвращает
+        поток перестройки, который нужно запустить после снятия блокировки.
+
+        Первое построение выполняется сразу: отвечать еще не из чего.
+        """
+        if self.snapshot is None:
+            self.snapshot = TitleSnapshot.load(**self.snapshot_options)
+            self.expires = time.monotonic() + self.ttl
+            return None
+        if self.touched is not None or self.expires > time.monotonic():
+            return None
+        self.touched = set()
+        self.rebuild_thread = threading.Thread(
+            target=self.rebuild, args=(self.generation,), daemon=True
+        )
+        return self.rebuild_thread
+
+    def rebuild(self, generation):
+        try:
+            snapshot = TitleSnapshot.load(**self.snapshot_options)
+        except Exception:
+            with self.lock:
+                if self.generation == generation:
+                    self.touched = None
+            raise
+        finally:
+            connection.close()
+        with self.lock:
+            if self.generation != generation:
+                return
+            for title_id in self.touched:
+                title = self.snapshot.titles.get(title_id)
+                if title is None:
+                    snapshot.delete(title_id)
+                else:
+                    snapshot.set(title_id, title[1], title[2])
+            self.snapshot = snapshot
+            self.touched = None
+            self.expires = time.monotonic() + self.ttl
+
+    def suggest(self, prefix, limit=10):
+        """Самые популярные произведения c названием, начинающимся c prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            rebuild_thread = self._ensure_built()
+            result = self.snapshot.suggest(prefix, limit)
+        if rebuild_thread is not None:
+            rebuild_thread.start()
+        return result
+
+
+title_index = TitleIndex(ttl=getattr(settings, "AUTOCOMPLETE_INDEX_TTL", 300))
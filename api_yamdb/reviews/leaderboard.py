@@ -0,0 +1,227 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, Q, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import (
+    GenreTitle, LeaderboardEntry, LeaderboardRefresh, Title
+)
+
+SIZE = getattr(settings, "LEADERBOARD_SIZE", 100)
+# Сколько оценок весит средняя оценка по всем произведениям.
+MIN_VOTES = getattr(settings, "LEADERBOARD_MIN_VOTES", 10)
+# При таком изменении средней оценки все рейтинги пересчитываются.
+MEAN_TOLERANCE = getattr(settings, "LEADERBOARD_MEAN_TOLERANCE", 0.05)
+# Запас на транзакции, зафиксированные после начала прошлого пересчета.
+OVERLAP = timedelta(minutes=1)
+
+SCOPE_FIELDS = {
+    LeaderboardEntry.OVERALL: None,
+    LeaderboardEntry.CATEGORY: "category_id",
+    LeaderboardEntry.GENRE: "genre_id",
+    LeaderboardEntry.YEAR: "year",
+}
+
+
+def get_global_mean():
+    totals = Title.objects.aggregate(
+        total=Sum("rating_sum"), count=Sum("rating_count")
+    )
+    if not totals["count"]:
+        return None
+    return totals["total"] / totals["count"]
+
+
+def weighted_rating(global_mean):
+    """
+    Байесовская оценка: средняя оценка произведения, к которой добавлено
+    MIN_VOTES оценок, равных средней по всем произведениям.
+
+    Так одна оценка 10 не поднимает произведение выше произведений c
+    сотнями высоких оценок.
+    """
+    return (
+        Cast(F("rating_sum"), FloatField()) + MIN_VOTES * global_mean
+    ) / (F("rating_count") + MIN_VOTES)
+
+
+def scope_titles(scope, key):
+    titles = Title.objects.filter(rating_count__gt=0)
+    if scope == LeaderboardEntry.CATEGORY:
+        return titles.filter(category_id=key)
+    if scope == LeaderboardEntry.GENRE:
+        return titles.filter(
+            id__in=GenreTitle.objects.filter(genre_id=key).values("title_id")
+        )
+    if scope == LeaderboardEntry.YEAR:
+        return titles.filter(year=key)
+    return titles
+
+
+def all_scopes():
+    scopes = {(LeaderboardEntry.OVERALL, None)}
+    titles = Title.objects.filter(rating_count__gt=0).order_by()
+    scopes.update(
+        (LeaderboardEntry.CATEGORY, key)
+        for key in titles.exclude(category=None)
+        .values_list("category_id", flat=True).distinct()
+    )
+    scopes.update(
+        (LeaderboardEntry.GENRE, key)
+        for key in GenreTitle.objects.filter(title__in=titles)
+        .values_list("genre_id", flat=True).distinct()
+    )
+    scopes.update(
+        (LeaderboardEntry.YEAR, key)
+        for key in titles.values_list("year", flat=True).distinct()
+    )
+    return scopes
+
+
+def entry_scope(scope, category_id, genre_id, year):
+    key = {"category": category_id, "genre": genre_id, "year": year}
+    return scope, key.get(scope)
+
+
+def candidate_counts():
+    """Число произведений c отзывами в каждом рейтинге."""
+    titles = Title.objects.filter(rating_count__gt=0).order_by()
+    counts = {(LeaderboardEntry.OVERALL, None): titles.count()}
+    for scope, field, queryset in (
+        (LeaderboardEntry.CATEGORY, "category_id",
+         titles.exclude(category=None)),
+        (LeaderboardEntry.YEAR, "year", titles),
+        (LeaderboardEntry.GENRE, "genre_id",
+         GenreTitle.objects.filter(title__in=titles).order_by()),
+    ):
+        counts.update(
+            ((scope, key), count)
+            for key, count in queryset.values_list(field)
+            .annotate(count=Count("pk"))
+        )
+    return counts
+
+
+def incomplete_scopes(entries):
+    """
+    Рейтинги c пропущенными местами или c меньшим числом мест, чем
+    подходящих произведений, — например, после удаления произведения,
+    стоявшего последним.
+    """
+    places = {
+        entry_scope(scope, *key): (count, last)
+        for scope, *key, count, last in entries.annotate(
+            count=Count("id"), last=Max("position")
+        ).values_list("scope", "category_id", "genre_id", "year",
+                      "count", "last")
+    }
+    scopes = set()
+    for scope, candidates in candidate_counts().items():
+        count, last = places.pop(scope, (0, 0))
+        if count != last or count < min(SIZE, candidates):
+            scopes.add(scope)
+    # Рейтинги, в которых не осталось произведений c отзывами.
+    scopes.update(places)
+    return scopes
+
+
+def changed_scopes(since):
+    """
+    Рейтинги, затронутые изменениями произведений и отзывов после since.
+
+    Сюда входят и рейтинги, в которых произведение стояло до изменения
+    категории, жанров или года, и рейтинги c местами, освободившимися
+    после удаления произведений (incomplete_scopes).
+    """
+    changed = Title.objects.filter(updated__gte=since).order_by()
+    scopes = set()
+    for category_id, year in changed.values_list("category_id", "year"):
+        scopes.add((LeaderboardEntry.OVERALL, None))
+        scopes.add((LeaderboardEntry.YEAR, year))
+        if category_id is not None:
+            scopes.add((LeaderboardEntry.CATEGORY, category_id))
+    scopes.update(
+        (LeaderboardEntry.GENRE, key)
+        for key in GenreTitle.objects.filter(title__in=changed)
+        .values_list("genre_id", flat=True).distinct()
+    )
+    entries = LeaderboardEntry.objects.order_by().values_list(
+        "scope", "category_id", "genre_id", "year"
+    )
+    for entry in entries.filter(title__in=changed):
+        scopes.add(entry_scope(*entry))
+        scopes.add((LeaderboardEntry.OVERALL, None))
+    scopes.update(incomplete_scopes(entries))
+    return scopes
+
+
+def entries_filter(scope, key):
+    field = SCOPE_FIELDS[scope]
+    lookup = Q(scope=scope)
+    if field is not None:
+        lookup &= Q(**{field: key})
+    return lookup
+
+
+def refresh_scope(scope, key, global_mean):
+    """Заново заполняет один рейтинг лучшими SIZE произведениями."""
+    LeaderboardEntry.objects.filter(entries_filter(scope, key)).delete()
+    if global_mean is None:
+        return
+    field = SCOPE_FIELDS[scope]
+    top = (
+        scope_titles(scope, key)
+        .annotate(score=weighted_rating(global_mean))
+        .order_by("-score", "-rating_count", "id")
+        .values_list("id", "score")[:SIZE]
+    )
+    LeaderboardEntry.objects.bulk_create(
+        LeaderboardEntry(
+            scope=scope,
+            position=position,
+            title_id=title_id,
+            weighted_rating=score,
+            **({field: key} if field else {}),
+        )
+        for position, (title_id, score) in enumerate(top, 1)
+    )
+
+
+def refresh_leaderboards(full=False):
+    """
+    Пересчитывает рейтинги лучших произведений.
+
+    Без full пересчитываются только рейтинги, затронутые изменениями
+    после прошлого запуска; все рейтинги пересчитываются при первом
+    запуске и при заметном изменении средней оценки. Возвращает запись
+    о выполненном пересчете.
+    """
+    started = timezone.now()
+    global_mean = get_global_mean()
+    last = LeaderboardRefresh.objects.first()
+    if (
+        last is None
+        or last.global_mean is None
+        or global_mean is None
+        or abs(global_mean - last.global_mean) > MEAN_TOLERANCE
+    ):
+        full = True
+    if not full:
+        global_mean = last.global_mean
+    with transaction.atomic():
+        if full:
+            LeaderboardEntry.objects.all().delete()
+            scopes = all_scopes()
+        else:
+            scopes = changed_scopes(last.started - OVERLAP)
+        for scope, key in scopes:
+            refresh_scope(scope, key, global_mean)
+        return LeaderboardRefresh.objects.create(
+            started=started,
+            global_mean=global_mean,
+            full=full,
+            scopes=len(scopes),
+        )
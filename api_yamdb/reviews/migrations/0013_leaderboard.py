@@ -0,0 +1,56 @@
+# Generated by Django 3.2 on 2026-10-17 04:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(verbose_name='Начало')),
+                ('global_mean', models.FloatField(null=True, verbose_name='Средняя оценка')),
+                ('full', models.BooleanField(default=False, verbose_name='Полный пересчет')),
+                ('scopes', models.PositiveIntegerField(default=0, verbose_name='Пересчитано рейтингов')),
+            ],
+            options={
+                'verbose_name': 'Пересчет рейтингов лучших',
+                'verbose_name_plural': 'Пересчеты рейтингов лучших',
+                'ordering': ['-started'],
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('overall', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр'), ('year', 'Год выпуска')], max_length=10, verbose_name='Рейтинг')),
+                ('year', models.IntegerField(blank=True, null=True, verbose_name='Год выпуска')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('weighted_rating', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+                'ordering': ['scope', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['scope', 'category', 'genre', 'year', 'position'], name='leaderboard_scope_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-17 04:52
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('rating', 'rating_sum', output_field=models.FloatField()), django.db.models.expressions.F('id'), name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+    ]
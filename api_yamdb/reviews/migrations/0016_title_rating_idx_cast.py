@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-17 05:36
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_title_counters_not_editable'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('rating', django.db.models.functions.comparison.Cast('rating_sum', models.FloatField())), django.db.models.expressions.F('id'), name='title_rating_idx'),
+        ),
+    ]
@@ -1,8 +1,24 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, Coalesce
 
 from core.models import User
 
+SCORES = range(1, 11)
+
+# Денормализованные счетчики произведения, которые Title.save() не пишет.
+COUNTER_FIELDS = (
+    "rating_sum", "rating_count", "rating",
+    *(f"score_{score}" for score in SCORES),
+)
+
+# Ключ сортировки по рейтингу без NULL: у произведения без отзывов
+# rating_sum равен нулю. Выражение без параметров, чтобы SQLite мог
+# использовать для него индекс title_rating_idx. Тип задан через Cast, a
+# не output_field у Coalesce: тот сравнивается по экземпляру поля, и
+# makemigrations каждый раз пересоздавал бы индекс.
+RATING_SORT_KEY = Coalesce("rating", Cast("rating_sum", models.FloatField()))
+
 
 class Category(models.Model):
     name = models.TextField("Название", max_length=256)
@@ -41,17 +57,151 @@ class Title(models.Model):
         null=True,
         blank=True,
     )
-    genre = models.ManyToManyField(Genre)
+    genre = models.ManyToManyField(Genre, through="GenreTitle")
     description = models.TextField("Описание", null=True, blank=True)
+    # Счетчики меняются только UPDATE c F-выражениями из reviews.services.
+    rating_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating = models.FloatField(
+        "Рейтинг", null=True, blank=True, editable=False
+    )
+    # Распределение оценок: количество отзывов c каждой оценкой от 1 до 10.
+    score_1 = models.PositiveIntegerField(
+        "Оценок 1", default=0, editable=False
+    )
+    score_2 = models.PositiveIntegerField(
+        "Оценок 2", default=0, editable=False
+    )
+    score_3 = models.PositiveIntegerField(
+        "Оценок 3", default=0, editable=False
+    )
+    score_4 = models.PositiveIntegerField(
+        "Оценок 4", default=0, editable=False
+    )
+    score_5 = models.PositiveIntegerField(
+        "Оценок 5", default=0, editable=False
+    )
+    score_6 = models.PositiveIntegerField(
+        "Оценок 6", default=0, editable=False
+    )
+    score_7 = models.PositiveIntegerField(
+        "Оценок 7", default=0, editable=False
+    )
+    score_8 = models.PositiveIntegerField(
+        "Оценок 8", default=0, editable=False
+    )
+    score_9 = models.PositiveIntegerField(
+        "Оценок 9", default=0, editable=False
+    )
+    score_10 = models.PositiveIntegerField(
+        "Оценок 10", default=0, editable=False
+    )
+    updated = models.DateTimeField(
+        "Дата изменения", auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ["-id"]
+        # Индексы для ?ordering=: сортировка и курсорная пагинация по
+        # любому ключу c id для однозначного порядка читают индекс.
+        indexes = (
+            models.Index(RATING_SORT_KEY, "id", name="title_rating_idx"),
+            models.Index(fields=["year", "id"], name="title_year_idx"),
+            models.Index(fields=["name", "id"], name="title_name_idx"),
+        )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет произведение без счетчиков COUNTER_FIELDS.
+
+        Иначе сохранение затерло бы изменения счетчиков отзывами, сделанные
+        после загрузки произведения.
+        """
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def score_distribution(self):
+        return {score: getattr(self, f"score_{score}") for score in SCORES}
+
+
+class SearchField(models.TextField):
+    """Скрытый столбец FTS5, совпадающий по имени c таблицей индекса."""
+
+
+@SearchField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class TitleSearch(models.Model):
+    """
+    Строка полнотекстового индекса произведений.
+
+    Виртуальная таблица FTS5 создается миграцией и заполняется
+    триггерами на таблице произведений, поэтому модель неуправляемая.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search",
+    )
+    name = models.CharField(max_length=256)
+    description = models.TextField(null=True)
+    document = SearchField(db_column="reviews_title_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "reviews_title_fts"
+
+
+class GenreTitle(models.Model):
+    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "reviews_title_genre"
+        verbose_name = "Жанр произведения"
+        verbose_name_plural = "Жанры произведений"
+        unique_together = (("title", "genre"),)
+        indexes = (
+            models.Index(
+                fields=["genre", "title"], name="genre_title_genre_idx"
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.title}: {self.genre}"
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -74,8 +224,8 @@ class Review(models.Model):
     score = models.PositiveSmallIntegerField(
         verbose_name="Рейтинг",
         validators=[
-            MinValueValidator(1, "Введенная оценка ниже допустимой"),
-            MaxValueValidator(10, "Введенная оценка выше допустимой"),
+            MinValueValidator(SCORES[0], "Введенная оценка ниже допустимой"),
+            MaxValueValidator(SCORES[-1], "Введенная оценка выше допустимой"),
         ],
     )
     pub_date = models.DateTimeField(
@@ -95,6 +245,13 @@ class Review(models.Model):
     def __str__(self):
         return f"Отзыв на {self.author.username} на {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        instance._loaded_title_id = instance.__dict__.get("title_id")
+        return instance
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -123,3 +280,71 @@ class Comment(models.Model):
 
     def __str__(self):
         return f"{self.author}: {self.review.title}"
+
+
+class LeaderboardEntry(models.Model):
+    """Место произведения в заранее рассчитанном рейтинге лучших."""
+
+    OVERALL = "overall"
+    CATEGORY = "category"
+    GENRE = "genre"
+    YEAR = "year"
+    SCOPES = (
+        (OVERALL, "Все произведения"),
+        (CATEGORY, "Категория"),
+        (GENRE, "Жанр"),
+        (YEAR, "Год выпуска"),
+    )
+
+    scope = models.CharField("Рейтинг", max_length=10, choices=SCOPES)
+    category = models.ForeignKey(
+        Category,
+        verbose_name="Категория",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    genre = models.ForeignKey(
+        Genre,
+        verbose_name="Жанр",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    year = models.IntegerField("Год выпуска", null=True, blank=True)
+    position = models.PositiveIntegerField("Место")
+    title = models.ForeignKey(
+        Title,
+        verbose_name="Произведение",
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+    )
+    weighted_rating = models.FloatField("Взвешенный рейтинг")
+
+    class Meta:
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Места в рейтингах"
+        ordering = ["scope", "position"]
+        indexes = (
+            models.Index(
+                fields=["scope", "category", "genre", "year", "position"],
+                name="leaderboard_scope_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.position}. {self.title}"
+
+
+class LeaderboardRefresh(models.Model):
+    """Запуск пересчета рейтингов лучших произведений."""
+
+    started = models.DateTimeField("Начало")
+    global_mean = models.FloatField("Средняя оценка", null=True)
+    full = models.BooleanField("Полный пересчет", default=False)
+    scopes = models.PositiveIntegerField("Пересчитано рейтингов", default=0)
+
+    class Meta:
+        verbose_name = "Пересчет рейтингов лучших"
+        verbose_name_plural = "Пересчеты рейтингов лучших"
+        ordering = ["-started"]
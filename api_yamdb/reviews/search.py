@@ -0,0 +1,103 @@
+import re
+
+from django.db import connection, connections
+
+from .models import TitleSearch
+
+TABLE = TitleSearch._meta.db_table
+WORD = re.compile(r"\w+")
+
+# Триггеры, поддерживающие индекс в актуальном состоянии. Django
+# пересоздает таблицу SQLite при изменении ее схемы, и триггеры на ней
+# при этом пропадают, поэтому после migrate они создаются заново.
+TRIGGERS = {
+    f"{TABLE}_insert": (
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_insert "
+        "AFTER INSERT ON reviews_title "
+        f"BEGIN INSERT INTO {TABLE}(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ),
+    f"{TABLE}_delete": (
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_delete "
+        "AFTER DELETE ON reviews_title "
+        f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    f"{TABLE}_update": (
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_update "
+        "AFTER UPDATE OF name, description ON reviews_title "
+        f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        f"INSERT INTO {TABLE}(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END"
+    ),
+}
+
+
+def is_supported(using=connection):
+    """Полнотекстовый индекс есть только в SQLite."""
+    return using.vendor == "sqlite"
+
+
+def ensure_triggers(using="default"):
+    """
+    Восстанавливает пропавшие триггеры индекса и перестраивает его.
+
+    Возвращает имена созданных триггеров.
+    """
+    db = connections[using]
+    if not is_supported(db):
+        return []
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE (type = 'table' AND name = %s) OR type = 'trigger'",
+            [TABLE],
+        )
+        existing = cursor.fetchall()
+        if ("table", TABLE) not in existing:
+            return []
+        missing = [
+            name for name in TRIGGERS if ("trigger", name) not in existing
+        ]
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+    return missing
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский запрос в выражение MATCH для FTS5.
+
+    Каждое слово ищется по префиксу, все слова обязательны; кавычки
+    экранируют синтаксис FTS5 во вводе пользователя.
+    """
+    return " ".join(f'"{word}"*' for word in WORD.findall(text))
+
+
+def search_titles(queryset, text, ranked=True):
+    """
+    Произведения, найденные по запросу; c ranked — в порядке
+    релевантности BM25, иначе в порядке queryset.
+    """
+    query = build_match_query(text)
+    if not query:
+        return queryset.none()
+    if not is_supported():
+        for word in WORD.findall(text):
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+    queryset = queryset.filter(search__document__match=query)
+    if ranked:
+        queryset = queryset.order_by("search__rank", "-id")
+    return queryset
+
+
+def rebuild_search_index(optimize=False):
+    """Перестраивает индекс по текущему содержимому таблицы произведений."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+        if optimize:
+            cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
@@ -0,0 +1,235 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, Max, OuterRef, Q, Subquery, Sum, Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+from core.cache import bump_versions
+
+from .autocomplete import title_index
+from .models import SCORES, Genre, GenreTitle, Review, Title
+
+DISTRIBUTION_FIELDS = [f"score_{score}" for score in SCORES]
+
+# Допустимое расхождение сохраненного и вычисленного среднего: они
+# считаются разными выражениями и могут отличаться в последних знаках.
+RATING_TOLERANCE = 1e-6
+
+
+def _shift_rating(title_id, score_delta, count_delta, distribution_delta):
+    """
+    Сдвигает счетчики рейтинга произведения одним UPDATE-запросом.
+
+    distribution_delta: {оценка: изменение числа отзывов c этой оценкой}.
+    """
+    new_sum = F("rating_sum") + score_delta
+    new_count = F("rating_count") + count_delta
+    Title.objects.filter(pk=title_id).update(
+        **{
+            f"score_{score}": F(f"score_{score}") + delta
+            for score, delta in distribution_delta.items()
+        },
+        rating_sum=new_sum,
+        rating_count=new_count,
+        updated=timezone.now(),
+        rating=Case(
+            When(
+                rating_count__lte=-count_delta,
+                then=Value(None, output_field=FloatField()),
+            ),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def add_score(title_id, score):
+    """Учитывает оценку нового отзыва в рейтинге произведения."""
+    _shift_rating(title_id, score, 1, {score: 1})
+
+
+def change_score(title_id, old_score, new_score):
+    """Учитывает изменение оценки отзыва в рейтинге произведения."""
+    if old_score != new_score:
+        _shift_rating(
+            title_id, new_score - old_score, 0, {old_score: -1, new_score: 1}
+        )
+
+
+def remove_score(title_id, score):
+    """Исключает оценку удаленного отзыва из рейтинга произведения."""
+    _shift_rating(title_id, -score, -1, {score: -1})
+
+
+def _send_genre_changed(title, action, genre_ids):
+    m2m_changed.send(
+        sender=GenreTitle, instance=title, action=action, reverse=False,
+        model=Genre, pk_set=genre_ids, using=title._state.db,
+    )
+
+
+@transaction.atomic
+def set_title_genres(title, genre_ids):
+    """
+    Заменяет жанры произведения, изменяя только отличающиеся связи.
+
+    В отличие от title.genre.set() выполняет один SELECT текущих связей,
+    не больше одного DELETE и одного INSERT. Сигналы m2m_changed
+    отправляются так же, как при set().
+    """
+    genre_ids = set(genre_ids)
+    links = GenreTitle.objects.filter(title=title)
+    current = set(links.values_list("genre_id", flat=True))
+    removed = current - genre_ids
+    added = genre_ids - current
+    if removed:
+        _send_genre_changed(title, "pre_remove", removed)
+        links.filter(genre_id__in=removed).delete()
+        _send_genre_changed(title, "post_remove", removed)
+    if added:
+        _send_genre_changed(title, "pre_add", added)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre_id=genre_id) for genre_id in added
+        )
+        _send_genre_changed(title, "post_add", added)
+    getattr(title, "_prefetched_objects_cache", {}).pop("genre", None)
+
+
+def bulk_create_titles(items, batch_size=1000):
+    """
+    Создает произведения c жанрами пакетными INSERT в одной транзакции.
+
+    items: словари validated_data TitleWriteSerializer. bulk_create не
+    отправляет сигналы, поэтому версии ответов и индекс подсказок
+    обновляются здесь. Возвращает созданные произведения c id.
+    """
+    titles = [
+        Title(**{key: value for key, value in item.items() if key != "genre"})
+        for item in items
+    ]
+    if not titles:
+        return titles
+    with transaction.atomic():
+        Title.objects.bulk_create(titles, batch_size=batch_size)
+        if titles[0].pk is None:
+            # SQLite в Django 3.2 не возвращает id из bulk_create. Строки
+            # вставлены в одной транзакции под блокировкой записи, поэтому
+            # их id идут подряд и заканчиваются максимальным.
+            last_id = Title.objects.aggregate(last=Max("id"))["last"]
+            for title_id, title in enumerate(
+                titles, last_id - len(titles) + 1
+            ):
+                title.pk = title_id
+        GenreTitle.objects.bulk_create(
+            (
+                GenreTitle(title=title, genre=genre)
+                for title, item in zip(titles, items)
+                for genre in item.get("genre", ())
+            ),
+            batch_size=batch_size,
+        )
+    bump_versions(Title)
+    for title in titles:
+        title_index.update(title.pk, title.name, 0)
+    return titles
+
+
+def remove_scores(title_id, score_counts):
+    """
+    Исключает из рейтинга произведения оценки нескольких удаленных
+    отзывов одним UPDATE; score_counts: {оценка: число отзывов}.
+    """
+    _shift_rating(
+        title_id,
+        -sum(score * count for score, count in score_counts.items()),
+        -sum(score_counts.values()),
+        {score: -count for score, count in score_counts.items()},
+    )
+
+
+def _rating_subqueries():
+    reviews = (
+        Review.objects.filter(title=OuterRef("pk"))
+        .order_by()
+        .values("title")
+    )
+    return {
+        "actual_sum": Coalesce(
+            Subquery(reviews.annotate(total=Sum("score")).values("total")),
+            0,
+        ),
+        "actual_count": Coalesce(
+            Subquery(reviews.annotate(total=Count("id")).values("total")),
+            0,
+        ),
+        "actual_rating": Subquery(
+            reviews.annotate(avg=Avg("score")).values("avg")
+        ),
+    }
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитывает рейтинг произведений по отзывам одним запросом."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    subqueries = _rating_subqueries()
+    return queryset.update(
+        rating_sum=subqueries["actual_sum"],
+        rating_count=subqueries["actual_count"],
+        rating=subqueries["actual_rating"],
+        updated=timezone.now(),
+    )
+
+
+def find_inconsistent_ratings(queryset=None):
+    """Возвращает произведения, чьи счетчики расходятся с отзывами."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    rating_drift = (
+        Q(rating__isnull=True) | Q(actual_rating__isnull=True)
+        | Q(rating__gt=F("actual_rating") + RATING_TOLERANCE)
+        | Q(rating__lt=F("actual_rating") - RATING_TOLERANCE)
+    ) & ~Q(rating__isnull=True, actual_rating__isnull=True)
+    return queryset.annotate(**_rating_subqueries()).filter(
+        ~Q(rating_sum=F("actual_sum")) | ~Q(rating_count=F("actual_count"))
+        | rating_drift
+    )
+
+
+def recalculate_score_distribution(queryset=None, batch_size=2000):
+    """
+    Пересчитывает распределение оценок произведений по отзывам.
+
+    Отзывы читаются за один проход c группировкой по произведению,
+    счетчики записываются пакетами bulk_update. Возвращает количество
+    произведений, у которых есть отзывы.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    counts = (
+        Review.objects.filter(title__in=queryset.values("pk"))
+        .order_by("title_id")
+        .values("title_id")
+        .annotate(**{
+            f"score_{score}": Count("id", filter=Q(score=score))
+            for score in SCORES
+        })
+    )
+    rows = counts.iterator(chunk_size=batch_size)
+    updated = 0
+    with transaction.atomic():
+        queryset.update(**{field: 0 for field in DISTRIBUTION_FIELDS})
+        while True:
+            batch = [
+                Title(pk=row.pop("title_id"), **row)
+                for row in islice(rows, batch_size)
+            ]
+            if not batch:
+                return updated
+            Title.objects.bulk_update(batch, DISTRIBUTION_FIELDS)
+            updated += len(batch)
@@ -0,0 +1,164 @@
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save
+)
+from django.dispatch import receiver
+
+from core.cache import bump_versions, get_response_cache, version_key
+
+from .autocomplete import title_index
+from .models import Category, Comment, Genre, Review, Title
+from .search import ensure_triggers
+from .services import (
+    add_score, change_score, recalculate_ratings,
+    recalculate_score_distribution, remove_score,
+)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Обновляет рейтинг произведения при создании и изменении отзыва."""
+    if raw:
+        return
+    old_score = getattr(instance, "_loaded_score", None)
+    old_title_id = getattr(instance, "_loaded_title_id", None)
+    if created:
+        if instance.title_id is not None:
+            add_score(instance.title_id, instance.score)
+    elif old_score is None:
+        titles = Title.objects.filter(
+            pk__in=[old_title_id, instance.title_id]
+        )
+        recalculate_ratings(titles)
+        recalculate_score_distribution(titles)
+    elif old_title_id != instance.title_id:
+        if old_title_id is not None:
+            remove_score(old_title_id, old_score)
+        if instance.title_id is not None:
+            add_score(instance.title_id, instance.score)
+    elif instance.title_id is not None:
+        change_score(instance.title_id, old_score, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Обновляет рейтинг произведения при удалении отзыва."""
+    if instance.title_id is not None:
+        remove_score(instance.title_id, instance.score)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def bump_title_version(sender, instance, **kwargs):
+    """Делает недействительными ответы, зависящие от произведения."""
+    bump_versions(Title, version_key(Title, instance.pk))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_model_version(sender, **kwargs):
+    """Делает недействительными ответы, зависящие от жанров и категорий."""
+    bump_versions(sender)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_version(sender, instance, **kwargs):
+    """
+    Делает недействительными ответы, зависящие от отзыва.
+
+    Отзыв меняет и рейтинг произведения, поэтому версия произведения
+    тоже увеличивается.
+    """
+    keys = [Review, version_key(Review, instance.pk)]
+    for title_id in {instance.title_id, getattr(
+        instance, "_loaded_title_id", None
+    )} - {None}:
+        keys += [
+            version_key(Review, f"title={title_id}"),
+            version_key(Title, title_id),
+        ]
+    bump_versions(*keys)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_version(sender, instance, **kwargs):
+    bump_versions(
+        version_key(Comment, instance.pk),
+        version_key(Comment, f"review={instance.review_id}"),
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # Изменены произведения жанра: затронутые id известны не всегда.
+        bump_versions(Title, Genre)
+    else:
+        bump_versions(Title, version_key(Title, instance.pk))
+
+
+@receiver(post_save, sender=Title)
+def update_title_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        title_index.update(
+            instance.pk, instance.name, instance.rating_count
+        )
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_title_index(sender, instance, **kwargs):
+    title_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def update_title_index_popularity(sender, instance, created, raw=False,
+                                  **kwargs):
+    """Популярность произведения в индексе — количество отзывов."""
+    if raw:
+        return
+    old_title_id = getattr(instance, "_loaded_title_id", None)
+    if created:
+        title_index.add_popularity(instance.title_id, 1)
+    elif old_title_id is not None and old_title_id != instance.title_id:
+        title_index.add_popularity(old_title_id, -1)
+        title_index.add_popularity(instance.title_id, 1)
+
+
+@receiver(post_delete, sender=Review)
+def decrease_title_index_popularity(sender, instance, **kwargs):
+    title_index.add_popularity(instance.title_id, -1)
+
+
+@receiver(post_migrate)
+def clear_response_cache(sender, **kwargs):
+    """После migrate и flush закешированные ответы больше не актуальны."""
+    get_response_cache().clear()
+
+
+@receiver(post_migrate)
+def clear_title_index(sender, **kwargs):
+    title_index.clear()
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using="default", **kwargs):
+    if sender.name == "reviews":
+        ensure_triggers(using)
+
+
+@receiver(post_save, sender=Review)
+def remember_saved_review(sender, instance, **kwargs):
+    """
+    Запоминает сохраненные значения отзыва для следующего сохранения.
+
+    Подключается последним, чтобы остальные обработчики видели значения
+    до изменения.
+    """
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_title(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user,
+                                       user_client):
+        author_map = {admin: admin_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'text', 9).json()
+        assert self.get_title(admin_client, title_id)['rating'] == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 1}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(admin_client, title_id)['rating'] == 3, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert self.get_title(admin_client, title_id)['rating'] == 1, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert self.get_title(admin_client, title_id)['rating'] is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе c автором.'
+        )
+
+    def test_02_recalculate_ratings(self, client, admin_client, admin):
+        from django.core.management import CommandError, call_command
+
+        from core.cache import bump_versions
+        from reviews.models import Title
+        from reviews.services import find_inconsistent_ratings
+
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        assert not find_inconsistent_ratings().exists()
+
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        bump_versions(Title)
+        cached = client.get('/api/v1/titles/').json()['results']
+        assert {title['rating'] for title in cached} == {None}
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+
+        call_command('recalculate_ratings')
+        call_command('recalculate_ratings', '--check')
+        title = self.get_title(admin_client, titles[0]['id'])
+        assert title['rating'] == 5, (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'рейтинг произведений.'
+        )
+        cached = client.get('/api/v1/titles/').json()['results']
+        assert {title['id']: title['rating'] for title in cached}[
+            titles[0]['id']
+        ] == 5, (
+            'Проверьте, что команда `recalculate_ratings` сбрасывает '
+            'кешированные списки произведений.'
+        )
+
+    def test_03_title_save_keeps_counters(self, admin_client, admin):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+
+        from reviews.models import Review, Title
+        from reviews.services import find_inconsistent_ratings
+
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        stale = Title.objects.get(pk=titles[0]['id'])
+        Review.objects.filter(title=stale).delete()
+        stale.name = 'Новое название'
+        stale.save()
+        assert not find_inconsistent_ratings().exists(), (
+            'Проверьте, что сохранение произведения не затирает счетчики '
+            'рейтинга, измененные отзывами после его загрузки.'
+        )
+        title = Title.objects.get(pk=stale.pk)
+        assert title.name == 'Новое название'
+        assert title.rating_count == 0 and title.score_5 == 0
+
+        request = RequestFactory().get('/admin/')
+        request.user = admin
+        form = site._registry[Title].get_form(request)
+        assert not {
+            'rating', 'rating_sum', 'rating_count', 'score_1', 'score_10'
+        } & set(form.base_fields), (
+            'Проверьте, что счетчики рейтинга нельзя изменить в админке.'
+        )
+
+    def test_04_check_finds_rating_drift(self, admin_client, admin):
+        from django.core.management import CommandError, call_command
+
+        from reviews.models import Title
+        from reviews.services import find_inconsistent_ratings
+
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        reviewed, empty = titles[0]['id'], titles[1]['id']
+        for title_id, rating in ((reviewed, 5.5), (reviewed, None),
+                                 (empty, 5.0)):
+            Title.objects.filter(pk=title_id).update(rating=rating)
+            assert list(find_inconsistent_ratings().values_list(
+                'id', flat=True
+            )) == [title_id], (
+                'Проверьте, что расхождение сохраненного рейтинга c '
+                'отзывами находится, даже если сумма и число оценок верны.'
+            )
+            with pytest.raises(CommandError):
+                call_command('recalculate_ratings', '--check')
+            call_command('recalculate_ratings')
+            assert not find_inconsistent_ratings().exists()
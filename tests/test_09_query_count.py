@@ -0,0 +1,251 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def test_01_title_list_query_count(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        few_titles_queries = count_queries(client, url)
+
+        category = Category.objects.first()
+        genres = list(Genre.objects.all())
+        for idx in range(10):
+            title = Title.objects.create(
+                name=f'Title {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+        many_titles_queries = count_queries(client, url)
+
+        assert many_titles_queries == few_titles_queries <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет постоянное '
+            'количество запросов к БД независимо от числа произведений на '
+            f'странице. Сейчас: {few_titles_queries} и '
+            f'{many_titles_queries}.'
+        )
+
+    def test_02_title_detail_query_count(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        queries = count_queries(client, url)
+        assert queries <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` загружает категорию и '
+            f'жанры произведения без лишних запросов. Сейчас: {queries}.'
+        )
+
+    def test_03_review_list_query_count(self, client, admin_client):
+        from core.models import User
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        empty_queries = count_queries(client, url)
+        Review.objects.create(
+            title_id=title_id, author=User.objects.first(),
+            text='Отзыв', score=5
+        )
+        few_reviews_queries = count_queries(client, url)
+
+        for idx in range(10):
+            author = User.objects.create(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title_id=title_id, author=author, text='Отзыв', score=idx + 1
+            )
+        many_reviews_queries = count_queries(client, url)
+
+        assert many_reviews_queries == few_reviews_queries <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов отзывов '
+            'вместе c отзывами и не проверяет произведение отдельным '
+            f'запросом. Сейчас: {few_reviews_queries} и '
+            f'{many_reviews_queries}.'
+        )
+        assert empty_queries <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` без отзывов проверяет '
+            f'произведение одним запросом. Сейчас: {empty_queries}.'
+        )
+
+    def test_04_comment_list_query_count(self, client, admin_client):
+        from core.models import User
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=User.objects.first(),
+            text='Отзыв', score=5
+        )
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        Comment.objects.create(
+            review=review, author=User.objects.first(), text='Комментарий'
+        )
+        few_comments_queries = count_queries(client, url)
+
+        for idx in range(10):
+            author = User.objects.create(
+                username=f'commenter{idx}', email=f'commenter{idx}@yamdb.fake'
+            )
+            Comment.objects.create(
+                review=review, author=author, text='Комментарий'
+            )
+        many_comments_queries = count_queries(client, url)
+
+        assert many_comments_queries == few_comments_queries <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+            'комментариев вместе c комментариями и не загружает отзыв '
+            f'отдельным запросом. Сейчас: {few_comments_queries} и '
+            f'{many_comments_queries}.'
+        )
+
+    def test_05_nested_list_missing_parent(self, client, admin_client):
+        from core.models import User
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=User.objects.first(),
+            text='Отзыв', score=5
+        )
+        urls = (
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/0/comments/',
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` для несуществующего '
+                'родительского объекта возвращает ответ со статусом 404.'
+            )
+
+    def test_06_review_create_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert not selects, (
+            f'Проверьте, что POST-запрос к `{url}` не проверяет '
+            'произведение и повторный отзыв отдельными запросами: это '
+            f'делают ограничения БД. Сейчас: {selects}.'
+        )
+        assert response.json()['title'] == titles[0]['id']
+
+        response = admin_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что повторный POST-запрос к `{url}` возвращает '
+            'ответ со статусом 400.'
+        )
+        url = '/api/v1/titles/0/reviews/'
+        response = admin_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что POST-запрос к `{url}` для несуществующего '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+    def test_07_comment_create_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 5}
+        ).json()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        url += 'comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'] not in ('BEGIN', 'COMMIT')
+        ]
+        assert len(queries) <= 2, (
+            f'Проверьте, что POST-запрос к `{url}` не загружает отзыв '
+            f'перед созданием комментария. Сейчас: {queries}.'
+        )
+
+        url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review["id"]}/'
+            'comments/'
+        )
+        response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что POST-запрос к `{url}` для отзыва другого '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+    def test_08_title_write_queries(self, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Фильм', slug='movie')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(10)
+        ]
+        slugs = [genre.slug for genre in genres]
+        url = '/api/v1/titles/'
+        admin_client.get('/api/v1/users/me/')
+
+        def write_queries(method, url, genre):
+            data = {
+                'name': 'Произведение', 'year': 2000,
+                'category': 'movie', 'genre': genre,
+            }
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(admin_client, method)(
+                    url, data=data, format='json'
+                )
+            assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED)
+            return len(context.captured_queries), response.json()
+
+        one_genre_queries, _ = write_queries('post', url, slugs[:1])
+        all_genres_queries, title = write_queries('post', url, slugs)
+        assert all_genres_queries == one_genre_queries, (
+            f'Проверьте, что POST-запрос к `{url}` разрешает слаги жанров '
+            'одним запросом и добавляет связи одним INSERT. Сейчас: '
+            f'{one_genre_queries} и {all_genres_queries}.'
+        )
+
+        url = f'/api/v1/titles/{title["id"]}/'
+        new_slugs = slugs[5:] + ['genre-0']
+        patch_queries, title = write_queries('patch', url, new_slugs)
+        assert sorted(title['genre']) == sorted(new_slugs)
+        assert set(
+            Title.objects.get(pk=title['id'])
+            .genre.values_list('slug', flat=True)
+        ) == set(new_slugs)
+        same_queries, _ = write_queries('patch', url, new_slugs)
+        assert same_queries < patch_queries <= all_genres_queries + 2, (
+            f'Проверьте, что PATCH-запрос к `{url}` меняет только '
+            'изменившиеся связи c жанрами. Сейчас: '
+            f'{patch_queries} и {same_queries}.'
+        )
+
+        response = admin_client.patch(
+            url, data={'genre': ['genre-1', 'missing']}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что несуществующий слаг жанра дает ответ со '
+            'статусом 400.'
+        )
@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_title_cursor_pages(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Title {idx}', year=2000) for idx in range(12)
+        )
+        url = '/api/v1/titles/?pagination=cursor'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert not any(
+                'COUNT(' in query['sql']
+                for query in context.captured_queries
+            ), (
+                'Проверьте, что курсорная пагинация не выполняет COUNT(*).'
+            )
+            data = response.json()
+            assert 'count' not in data
+            seen.extend(title['id'] for title in data['results'])
+            url = data['next']
+
+        expected = list(
+            Title.objects.order_by('-id').values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` обходит '
+            'все произведения в порядке `-id` без пропусков и повторов.'
+        )
+
+    def test_02_page_number_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что по умолчанию `/api/v1/titles/` использует '
+            'постраничную пагинацию.'
+        )
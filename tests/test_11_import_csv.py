@@ -0,0 +1,145 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCsv:
+
+    def test_01_import_static_data(self):
+        from reviews.models import Comment, Review, Title
+        from reviews.services import find_inconsistent_ratings
+
+        call_command('import_csv', '--batch-size', '10')
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert Title.genre.through.objects.count() == 42, (
+            'Проверьте, что `import_csv` загружает связи произведений c '
+            'жанрами из `genre_title.csv`.'
+        )
+        assert not find_inconsistent_ratings().exists(), (
+            'Проверьте, что после импорта рейтинги произведений '
+            'пересчитываются.'
+        )
+
+    def test_02_import_is_repeatable(self):
+        from reviews.models import Review, Title
+
+        call_command('import_csv')
+        call_command('import_csv')
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный запуск `import_csv` не дублирует и '
+            'не ломает уже загруженные данные.'
+        )
+
+    def test_03_upsert_updates_existing_rows(self, tmp_path):
+        from reviews.models import Category
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n2,Книга,book\n', encoding='utf8'
+        )
+        call_command('import_csv', '--path', str(tmp_path))
+        Category.objects.filter(id=1).update(name='Изменено')
+
+        call_command('import_csv', '--path', str(tmp_path))
+        assert Category.objects.get(id=1).name == 'Изменено'
+
+        call_command('import_csv', '--path', str(tmp_path), '--upsert')
+        assert Category.objects.get(id=1).name == 'Фильм', (
+            'Проверьте, что `import_csv --upsert` обновляет уже '
+            'существующие строки.'
+        )
+        assert Category.objects.count() == 2
+
+    def test_04_resume_from_checkpoint(self, tmp_path):
+        from django.db import IntegrityError
+
+        from reviews.models import Category
+
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n2,Книга,book\n3,Музыка,music\n',
+            encoding='utf8'
+        )
+        Category.objects.create(id=10, name='Музыка', slug='music')
+        with pytest.raises(IntegrityError):
+            call_command(
+                'import_csv', '--path', str(tmp_path), '--batch-size', '1'
+            )
+        assert (tmp_path / '.import_csv_checkpoint.json').exists()
+
+        Category.objects.filter(id__in=[1, 10]).delete()
+        call_command('import_csv', '--path', str(tmp_path))
+        assert set(Category.objects.values_list('id', flat=True)) == {2, 3}, (
+            'Проверьте, что `import_csv` продолжает прерванный импорт c '
+            'контрольной точки, не загружая файл заново.'
+        )
+        assert not (tmp_path / '.import_csv_checkpoint.json').exists()
+
+    def test_05_upsert_keeps_columns_missing_from_csv(self, tmp_path):
+        from core.models import User
+        from reviews.models import Title
+
+        (tmp_path / 'users.csv').write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            '100,bingobongo,bingobongo@yamdb.fake,user,,,\n',
+            encoding='utf8'
+        )
+        call_command('import_csv', '--path', str(tmp_path))
+        user = User.objects.get(id=100)
+        user.set_password('secret-password')
+        user.is_staff = True
+        user.confirmation_code = '123456'
+        user.save()
+        date_joined = user.date_joined
+
+        (tmp_path / 'users.csv').write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            '100,bingobongo,bingobongo@yamdb.fake,moderator,Био,,\n'
+            '102,newcomer,newcomer@yamdb.fake,user,,,\n',
+            encoding='utf8'
+        )
+        call_command('import_csv', '--path', str(tmp_path), '--upsert')
+        user = User.objects.get(id=100)
+        assert (user.role, user.bio) == ('moderator', 'Био')
+        assert user.check_password('secret-password'), (
+            'Проверьте, что `import_csv --upsert` не затирает поля, '
+            'которых нет в csv-файле.'
+        )
+        assert user.is_staff and user.confirmation_code == '123456'
+        assert user.date_joined == date_joined
+        assert User.objects.filter(id=102, username='newcomer').exists(), (
+            'Проверьте, что `import_csv --upsert` добавляет новые строки.'
+        )
+
+        (tmp_path / 'users.csv').unlink()
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм,2000,\n', encoding='utf8'
+        )
+        call_command('import_csv', '--path', str(tmp_path))
+        Title.objects.filter(id=1).update(rating_count=3, rating_sum=15)
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм 2,2001,\n', encoding='utf8'
+        )
+        call_command('import_csv', '--path', str(tmp_path), '--upsert')
+        title = Title.objects.get(id=1)
+        assert (title.name, title.year) == ('Фильм 2', 2001)
+
+    def test_06_import_keeps_pub_date_from_csv(self):
+        from datetime import datetime, timezone
+
+        from reviews.models import Comment, Review
+
+        call_command('import_csv')
+        assert Review.objects.get(id=1).pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), (
+            'Проверьте, что `import_csv` сохраняет дату публикации отзыва '
+            'из csv-файла.'
+        )
+        assert Comment.objects.get(id=1).pub_date == datetime(
+            2020, 1, 13, 23, 20, 2, 422000, tzinfo=timezone.utc
+        ), (
+            'Проверьте, что `import_csv` сохраняет дату публикации '
+            'комментария из csv-файла.'
+        )
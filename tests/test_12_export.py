@@ -0,0 +1,55 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Export:
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        url = '/api/v1/export/titles.csv'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_export_formats(self, admin_client):
+        call_command('import_csv')
+
+        response = admin_client.get('/api/v1/export/review.csv')
+        content = b''.join(response.streaming_content).decode('utf8')
+        assert content.startswith(
+            'id,title_id,text,author,score,pub_date'
+        ), (
+            'Проверьте, что выгрузка в csv использует заголовки, '
+            'которые понимает `import_csv`.'
+        )
+
+        response = admin_client.get('/api/v1/export/titles.ndjson.gz')
+        assert response['Content-Type'] == 'application/gzip'
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).decode('utf8').splitlines()
+        assert len(lines) == 32
+        assert json.loads(lines[0])['name'] == 'Побег из Шоушенка'
+
+    def test_03_export_command_round_trip(self, tmp_path):
+        from reviews.models import Review, Title
+
+        call_command('import_csv')
+        call_command('export_data', str(tmp_path))
+        Title.objects.all().delete()
+        assert not Review.objects.exists()
+
+        call_command('import_csv', '--path', str(tmp_path))
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Title.genre.through.objects.count() == 42, (
+            'Проверьте, что файлы `export_data` загружаются обратно '
+            'командой `import_csv`.'
+        )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+
+
+class TrackingBackend(locmem.EmailBackend):
+    opened = []
+
+    def open(self):
+        self.broken = False
+        self.closed = False
+        TrackingBackend.opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+    def send_messages(self, messages):
+        if self.broken:
+            raise ConnectionError('Соединение разорвано')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13EmailOutbox:
+
+    def test_01_signup_queues_email(self, client):
+        from core.models import OutgoingEmail
+
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо c кодом подтверждения не отправляется '
+            'во время обработки запроса.'
+        )
+        queued = OutgoingEmail.objects.get(email=data['email'])
+        assert queued.status == OutgoingEmail.PENDING
+
+        call_command('send_emails', '--once', '--workers', '2')
+        queued.refresh_from_db()
+        assert queued.status == OutgoingEmail.SENT
+        assert mail.outbox[-1].to == [data['email']]
+        assert queued.context['code'] in mail.outbox[-1].body
+
+    def test_02_failed_batch_is_retried(self, monkeypatch):
+        from core.models import OutgoingEmail
+        from core.services import EmailSender, queue_confirmation_email
+
+        queued = queue_confirmation_email('retry@yamdb.fake', '123456')
+
+        def broken_send(self, outgoing_emails):
+            raise ConnectionError('SMTP недоступен')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailSender, 'send_batch', broken_send)
+            assert EmailSender().drain() == 0
+        queued.refresh_from_db()
+        assert queued.status == OutgoingEmail.PENDING
+        assert queued.attempts == 1
+
+        assert EmailSender().drain() == 1
+        queued.refresh_from_db()
+        assert queued.status == OutgoingEmail.SENT
+
+    def test_03_connections_reused_across_drains(self, settings):
+        from core.services import EmailSender, queue_confirmation_email
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_13_email_outbox.TrackingBackend'
+        )
+        TrackingBackend.opened = []
+        sender = EmailSender(workers=3)
+        try:
+            for drain in range(5):
+                for idx in range(6):
+                    queue_confirmation_email(
+                        f'drain{drain}-{idx}@yamdb.fake', '123456'
+                    )
+                assert sender.drain(batch_size=1) == 6
+            assert len(TrackingBackend.opened) <= 3, (
+                'Проверьте, что потоки EmailSender переиспользуют '
+                'соединения между вызовами drain(). Открыто соединений: '
+                f'{len(TrackingBackend.opened)}.'
+            )
+            assert len(sender.connections) == len(TrackingBackend.opened)
+        finally:
+            sender.close()
+        assert all(
+            connection.closed for connection in TrackingBackend.opened
+        )
+
+    def test_04_connection_reopened_after_error(self, settings):
+        from core.models import OutgoingEmail
+        from core.services import EmailSender, queue_confirmation_email
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_13_email_outbox.TrackingBackend'
+        )
+        TrackingBackend.opened = []
+        sender = EmailSender()
+        try:
+            queue_confirmation_email('first@yamdb.fake', '123456')
+            assert sender.drain() == 1
+            dead, = TrackingBackend.opened
+            dead.broken = True
+            queued = queue_confirmation_email('second@yamdb.fake', '123456')
+            assert sender.drain() == 0
+            assert dead.closed, (
+                'Проверьте, что после ошибки отправки соединение '
+                'закрывается.'
+            )
+            assert sender.drain() == 1, (
+                'Проверьте, что после ошибки отправки EmailSender '
+                'открывает новое соединение, а не использует разорванное.'
+            )
+            assert len(TrackingBackend.opened) == 2
+            assert sender.connections == [TrackingBackend.opened[1]]
+        finally:
+            sender.close()
+        queued.refresh_from_db()
+        assert queued.status == OutgoingEmail.SENT
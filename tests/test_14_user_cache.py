@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "core_user"' in query['sql']
+    ]
+    return response, len(queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14UserCache:
+
+    def test_01_authenticated_read_skips_user_query(self, user_client):
+        url = '/api/v1/categories/'
+        user_client.get(url)
+        response, queries = count_user_queries(user_client, url)
+        assert response.status_code == HTTPStatus.OK
+        assert queries == 0, (
+            'Проверьте, что пользователь из JWT-токена берется из кеша и '
+            'не загружается из БД при каждом запросе.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        url = '/api/v1/categories/'
+        data = {'name': 'Фильм', 'slug': 'films'}
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кеше аутентификации.'
+        )
+
+    def test_03_deleted_user_is_not_authenticated(self, admin_client, user,
+                                                  user_client):
+        user_client.get('/api/v1/users/me/')
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,31 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15FakeData:
+
+    def test_01_generate_fake_data(self):
+        from core.models import User
+        from reviews.models import Comment, Review, Title
+        from reviews.services import find_inconsistent_ratings
+
+        call_command(
+            'generate_fake_data', '--users', '20', '--titles', '50',
+            '--reviews', '300', '--comments', '100', '--batch-size', '64'
+        )
+        assert User.objects.count() == 20
+        assert Title.objects.count() == 50
+        assert Title.genre.through.objects.count() == 100
+        assert Review.objects.count() == 300
+        assert Comment.objects.count() == 100
+        assert not find_inconsistent_ratings().exists()
+
+        counts = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределяются неравномерно: у самых '
+            'популярных произведений их должно быть намного больше.'
+        )
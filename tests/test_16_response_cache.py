@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response.json(), len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ResponseCache:
+
+    def test_01_anonymous_lists_are_cached(self, client, admin_client):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/titles/?genre=horror',
+                    '/api/v1/categories/', '/api/v1/genres/?search=Ужасы'):
+            first, _ = get(client, url)
+            second, queries = get(client, url)
+            assert second == first
+            assert queries == 0, (
+                f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+                'отдается из кеша без запросов к БД.'
+            )
+
+    def test_02_changes_invalidate_cache(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        data, _ = get(client, '/api/v1/titles/')
+        assert data['count'] == 2
+
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2000, 'genre': ['horror'],
+            'category': 'films'
+        })
+        data, _ = get(client, '/api/v1/titles/')
+        assert data['count'] == 3, (
+            'Проверьте, что создание произведения сбрасывает кеш списка.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        data, _ = get(client, '/api/v1/titles/')
+        rating = {
+            title['id']: title['rating'] for title in data['results']
+        }
+        assert rating[titles[0]['id']] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кеш списка произведений.'
+        )
+
+        admin_client.delete('/api/v1/genres/horror/')
+        data, _ = get(client, '/api/v1/genres/')
+        assert 'horror' not in [genre['slug'] for genre in data['results']]
+        data, _ = get(client, '/api/v1/titles/?genre=horror')
+        assert data['results'] == [], (
+            'Проверьте, что после удаления жанра кешированный список '
+            'произведений c фильтром по этому жанру сбрасывается.'
+        )
+
+    def test_03_versions_bumped_after_commit(self, client, admin_client):
+        from django.db import transaction
+
+        from core.cache import get_versions, version_key
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        keys = [Title, version_key(Title, titles[0]['id'])]
+        before = get_versions(keys)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        with transaction.atomic():
+            Title.objects.filter(pk=titles[0]['id']).first().save()
+            assert get_versions(keys) == before, (
+                'Проверьте, что версии кеша меняются только после COMMIT, '
+                'чтобы параллельный запрос не закешировал старые данные '
+                'под новой версией.'
+            )
+        after = get_versions(keys)
+        assert all(new != old for new, old in zip(after, before)), (
+            'Проверьте, что после COMMIT версии кеша меняются.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+        with transaction.atomic():
+            Title.objects.filter(pk=titles[0]['id']).first().save()
+            transaction.set_rollback(True)
+        assert get_versions(keys) == after, (
+            'Проверьте, что откат транзакции не меняет версии кеша.'
+        )
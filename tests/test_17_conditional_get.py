@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings as django_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` c актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ 304 для `{url}` формируется без '
+            'запросов к БД.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        return etag
+
+    def test_01_not_modified(self, client, admin_client, admin, user,
+                             user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        for url in (
+            '/api/v1/titles/', title_url, f'{title_url}reviews/',
+            review_url, f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+        ):
+            self.check_not_modified(client, url)
+
+    def test_02_changes_update_etag(self, client, admin_client, admin,
+                                    user, user_client, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        title_etag = self.check_not_modified(client, title_url)
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 1)
+        for url, etag in ((title_url, title_etag),
+                          (reviews_url, reviews_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что новый отзыв меняет ETag `{url}`.'
+            )
+        assert client.get(title_url).json()['rating'] == 3
+
+        moderator_client.patch(
+            f'{comments_url}{comments[0]["id"]}/', data={'text': 'new'}
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментария меняет ETag списка '
+            'комментариев.'
+        )
+
+    def test_03_etag_shared_between_processes(self, client, admin_client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+        # Запись из другого процесса, например import_csv или воркера.
+        subprocess.run(
+            [
+                sys.executable, '-c',
+                'import django; django.setup(); '
+                'from core.cache import bump_versions, version_key; '
+                'from reviews.models import Title; '
+                f'bump_versions(Title, version_key(Title, {title.id}))',
+            ],
+            check=True,
+            cwd=django_settings.BASE_DIR,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings',
+            },
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение из другого процесса меняет ETag: '
+            'версии должны храниться в общем для процессов кеше.'
+        )
+
+    def test_04_process_local_cache_rejected(self, settings):
+        from core.checks import check_response_cache
+
+        assert check_response_cache(None) == []
+        settings.DELETION_BACKGROUND_THRESHOLD = None
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            }
+        }
+        errors = check_response_cache(None)
+        assert [error.id for error in errors] == ['core.E001'], (
+            'Проверьте, что кеш ответов, локальный для процесса, '
+            'отклоняется проверкой core.E001.'
+        )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def get_names(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleFilters:
+
+    def test_01_genre_modes(self, client, admin_client):
+        create_titles(admin_client)
+        assert get_names(client, '/api/v1/titles/?genre=horror,drama') == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что `?genre=` c несколькими slug через запятую '
+            'возвращает произведения хотя бы c одним из жанров.'
+        )
+        url = '/api/v1/titles/?genre=horror,comedy&genre_mode=all'
+        assert get_names(client, url) == ['Терминатор'], (
+            'Проверьте, что `genre_mode=all` возвращает произведения, '
+            'у которых есть все перечисленные жанры.'
+        )
+        url = '/api/v1/titles/?genre=horror,drama&genre_mode=all'
+        assert get_names(client, url) == []
+        response = client.get('/api/v1/titles/?genre=horror&genre_mode=x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное значение `genre_mode` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_02_unknown_slug_gives_empty_page(self, client, admin_client):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/?genre=unknown',
+                    '/api/v1/titles/?category=unknown'):
+            assert get_names(client, url) == [], (
+                f'Проверьте, что GET-запрос к `{url}` c несуществующим slug '
+                'возвращает пустую страницу, а не ответ со статусом 404.'
+            )
+
+    def test_03_several_categories(self, client, admin_client):
+        create_titles(admin_client)
+        assert get_names(client, '/api/v1/titles/?category=films,books') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        url = '/api/v1/titles/?category=films&genre=comedy,drama'
+        assert get_names(client, url) == ['Терминатор']
+
+    def test_04_filter_query_count(self, client, admin_client):
+        create_titles(admin_client)
+        counts = []
+        for url in ('/api/v1/titles/',
+                    '/api/v1/titles/?genre=horror,comedy&genre_mode=all'
+                    '&category=films,books'):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что фильтрация по жанрам и категориям не выполняет '
+            'дополнительных запросов к БД.'
+        )
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', {'q': text})
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что GET-запрос к `/api/v1/titles/?q=` возвращает ответ '
+        'со статусом 200.'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleSearch:
+
+    def test_01_prefix_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert search(client, 'терм') == ['Терминатор'], (
+            'Проверьте, что `?q=` ищет произведения по началу слова без '
+            'учета регистра.'
+        )
+        assert search(client, 'КРЕП ореш') == ['Крепкий орешек']
+        assert search(client, 'back') == ['Терминатор'], (
+            'Проверьте, что `?q=` ищет и по описанию произведения.'
+        )
+        assert search(client, 'терминатор орешек') == []
+        assert sorted(search(client, '  ')) == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что пустой `?q=` не фильтрует произведения.'
+        assert search(client, '"AND (NOT') == []
+
+    def test_02_name_matches_rank_first(self, client, admin_client):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Сказки', year=2000, description='Про дракона и рыцаря'
+        )
+        Title.objects.create(name='Дракон', year=2000)
+        assert search(client, 'дракон') == ['Дракон', 'Сказки'], (
+            'Проверьте, что совпадения в названии выше в выдаче, чем '
+            'совпадения в описании.'
+        )
+
+    def test_03_index_follows_changes(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Хищник'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert search(client, 'хищ') == ['Хищник'], (
+            'Проверьте, что индекс обновляется при изменении произведения.'
+        )
+        assert search(client, 'терм') == []
+        Title.objects.filter(id=titles[1]['id']).delete()
+        assert search(client, 'орешек') == [], (
+            'Проверьте, что удаленное произведение пропадает из поиска.'
+        )
+
+    def test_04_blank_query_shares_cache(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?q=')
+        assert response.json()['count'] == 2
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что запрос c пустым `?q=` не кеширует пустую '
+            'страницу для `/api/v1/titles/`.'
+        )
+        response = client.get('/api/v1/titles/?q=терм')
+        assert response.json()['count'] == 1
+        response = client.get('/api/v1/titles/?q=')
+        assert response.json()['count'] == 2
+
+    def test_05_rebuild_command(self, client, admin_client):
+        create_titles(admin_client)
+        call_command('rebuild_search_index', '--optimize')
+        assert search(client, 'терм') == ['Терминатор']
@@ -0,0 +1,179 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+URL = '/api/v1/titles/autocomplete/'
+
+
+def suggest(client, prefix, **params):
+    response = client.get(URL, {'prefix': prefix, **params})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return [title['name'] for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleAutocomplete:
+
+    def test_01_prefix_suggestions(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(URL, {'prefix': 'тер'})
+        assert response.json() == [
+            {'id': titles[0]['id'], 'name': 'Терминатор'}
+        ], (
+            f'Проверьте, что `{URL}?prefix=` возвращает id и название '
+            'произведений, название которых начинается c префикса.'
+        )
+        assert suggest(client, '  КРЕПКИЙ   ор') == ['Крепкий орешек'], (
+            'Проверьте, что префикс нормализуется: регистр и лишние '
+            'пробелы не учитываются.'
+        )
+        assert suggest(client, 'орешек') == []
+        assert suggest(client, '') == []
+        response = client.get(URL, {'prefix': 'т', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_no_queries_after_build(self, client, admin_client):
+        create_titles(admin_client)
+        suggest(client, 'т')
+        with CaptureQueriesContext(connection) as context:
+            suggest(client, 'те')
+            suggest(client, 'кр')
+        assert len(context.captured_queries) == 0, (
+            f'Проверьте, что `{URL}` отвечает из индекса в памяти без '
+            'запросов к БД.'
+        )
+
+    def test_03_popular_titles_first(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.create(name='Крепость', year=2000)
+        assert suggest(client, 'креп') == ['Крепкий орешек', 'Крепость']
+        popular = Title.objects.get(name='Крепость')
+        create_single_review(admin_client, popular.id, 'Отзыв', 5)
+        assert suggest(client, 'креп') == ['Крепость', 'Крепкий орешек'], (
+            'Проверьте, что подсказки упорядочены по количеству отзывов.'
+        )
+        assert suggest(client, 'креп', limit=1) == ['Крепость']
+
+    def test_04_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        suggest(client, 'т')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Ёжик'}
+        )
+        assert suggest(client, 'ежи') == ['Ёжик'], (
+            'Проверьте, что индекс обновляется при изменении произведения.'
+        )
+        assert suggest(client, 'тер') == []
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert suggest(client, 'креп') == [], (
+            'Проверьте, что удаленное произведение пропадает из индекса.'
+        )
+
+    def test_05_wide_prefixes_precomputed(self, monkeypatch):
+        from reviews.autocomplete import TitleIndex, TitleSnapshot
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000, rating_count=idx % 7)
+            for idx in range(30)
+        )
+        Title.objects.bulk_create(
+            Title(name=name, year=2000)
+            for name in ('Простор', 'Прогулка', 'Тень')
+        )
+        index = TitleIndex(ttl=300, scan_limit=4, capacity=8)
+
+        def expected(prefix, limit):
+            titles = [
+                title for title in Title.objects.all()
+                if title.name.casefold().startswith(prefix)
+            ]
+            titles.sort(key=lambda title: (
+                -title.rating_count, title.name.casefold(), title.id
+            ))
+            return [
+                {'id': title.id, 'name': title.name}
+                for title in titles[:limit]
+            ]
+
+        assert index.suggest('про', 4) == expected('про', 4)
+        assert 'про' in index.snapshot.top
+
+        def no_scan(*args):
+            raise AssertionError(
+                'Проверьте, что ответ для широкого префикса берется из '
+                'заранее вычисленного списка без просмотра диапазона.'
+            )
+
+        with monkeypatch.context() as patch:
+            patch.setattr(TitleSnapshot, '_scan', no_scan)
+            for prefix in ('п', 'про', 'произв'):
+                assert index.suggest(prefix, 4) == expected(prefix, 4)
+
+        titles = list(Title.objects.filter(name__startswith='Произведение'))
+        for step, title in enumerate(titles):
+            delta = 3 if step % 2 else -min(2, title.rating_count)
+            title.rating_count += delta
+            Title.objects.filter(pk=title.pk).update(
+                rating_count=title.rating_count
+            )
+            index.add_popularity(title.pk, delta)
+        renamed = titles[0]
+        Title.objects.filter(pk=renamed.pk).update(name='Тетрадь')
+        index.update(renamed.pk, 'Тетрадь', renamed.rating_count)
+        Title.objects.filter(pk=titles[1].pk).delete()
+        index.remove(titles[1].pk)
+        for prefix in ('п', 'про', 'произв', 'произведение 2', 'т'):
+            for limit in (1, 4, 8):
+                assert index.suggest(prefix, limit) == (
+                    expected(prefix, limit)
+                ), (
+                    'Проверьте, что после изменений подсказки совпадают '
+                    f'c выборкой из БД: {prefix!r}, limit={limit}.'
+                )
+
+    def test_06_rebuild_in_background(self, monkeypatch):
+        import threading
+
+        from reviews.autocomplete import TitleIndex, TitleSnapshot
+        from reviews.models import Title
+
+        old = Title.objects.create(name='Крепость', year=2000)
+        index = TitleIndex(ttl=0)
+        assert index.suggest('кр') == [{'id': old.id, 'name': 'Крепость'}]
+
+        started = threading.Event()
+        release = threading.Event()
+        load = TitleSnapshot.load.__func__
+
+        def slow_load(cls, **kwargs):
+            started.set()
+            release.wait(5)
+            return load(cls, **kwargs)
+
+        monkeypatch.setattr(TitleSnapshot, 'load', classmethod(slow_load))
+        new = Title.objects.create(name='Кредо', year=2000)
+        assert index.suggest('кр') == [{'id': old.id, 'name': 'Крепость'}], (
+            'Проверьте, что во время перестройки индекса подсказки '
+            'отдаются из прежнего индекса без ожидания.'
+        )
+        assert started.wait(5)
+        index.update(old.id, 'Крепость', 5)
+        release.set()
+        index.rebuild_thread.join(5)
+        assert index.suggest('кр', 2) == [
+            {'id': old.id, 'name': 'Крепость'},
+            {'id': new.id, 'name': 'Кредо'},
+        ], (
+            'Проверьте, что перестроенный индекс видит новые произведения '
+            'и изменения, сделанные во время перестройки.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+def distribution(**counts):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(counts)
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ScoreDistribution:
+
+    def get_distribution(self, client, title_id):
+        response = client.get(
+            f'/api/v1/titles/{title_id}/', {'expand': 'score_distribution'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'score_distribution' in response.json(), (
+            'Проверьте, что `?expand=score_distribution` добавляет в ответ '
+            'распределение оценок произведения.'
+        )
+        return response.json()['score_distribution']
+
+    def test_01_distribution_follows_reviews(self, client, admin_client,
+                                             user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert 'score_distribution' not in response.json(), (
+            'Проверьте, что распределение оценок выводится только по запросу.'
+        )
+        assert self.get_distribution(client, title_id) == distribution()
+
+        create_single_review(admin_client, title_id, 'text', 9)
+        review = create_single_review(user_client, title_id, 'text', 9)
+        assert self.get_distribution(client, title_id) == distribution(
+            **{'9': 2}
+        ), 'Проверьте, что новый отзыв учитывается в распределении оценок.'
+
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+            data={'score': 3}
+        )
+        assert self.get_distribution(client, title_id) == distribution(
+            **{'3': 1, '9': 1}
+        ), 'Проверьте, что изменение оценки переносит ее в другой столбец.'
+
+        user_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+        )
+        assert self.get_distribution(client, title_id) == distribution(
+            **{'9': 1}
+        ), 'Проверьте, что удаленный отзыв исключается из распределения.'
+
+    def test_02_list_expand(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(
+            '/api/v1/titles/', {'expand': 'score_distribution'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert title['score_distribution'] == distribution()
+
+    def test_03_rebuild_command(self, client, admin_client):
+        from core.cache import bump_versions
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'text', 4)
+        Title.objects.update(score_4=0, score_10=7)
+        bump_versions(Title)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url, {'expand': 'score_distribution'})['ETag']
+        call_command('rebuild_score_distribution', '--batch-size', '1')
+        response = client.get(
+            url, {'expand': 'score_distribution'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что команда `rebuild_score_distribution` меняет '
+            'ETag произведений.'
+        )
+        assert self.get_distribution(client, titles[0]['id']) == (
+            distribution(**{'4': 1})
+        ), (
+            'Проверьте, что команда `rebuild_score_distribution` '
+            'пересчитывает распределение оценок по отзывам.'
+        )
+        assert self.get_distribution(client, titles[1]['id']) == (
+            distribution()
+        )
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/top/'
+
+
+def get_top(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return [entry['title']['name'] for entry in response.json()]
+
+
+def create_scores(django_user_model, titles_scores):
+    from reviews.models import Review, Title
+
+    for name, scores in titles_scores.items():
+        title = Title.objects.get(name=name)
+        for idx, score in enumerate(scores):
+            author, _ = django_user_model.objects.get_or_create(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title=title, text='text', score=score
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Leaderboard:
+
+    def prepare(self, admin_client, django_user_model):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        Title.objects.create(name='Гадкий утенок', year=1984)
+        create_scores(django_user_model, {
+            'Терминатор': [10],
+            'Крепкий орешек': [9, 9, 9, 9, 9],
+            'Гадкий утенок': [2],
+        })
+        call_command('refresh_leaderboards')
+
+    def test_01_weighted_rating(self, client, admin_client,
+                                django_user_model):
+        self.prepare(admin_client, django_user_model)
+        assert get_top(client) == [
+            'Крепкий орешек', 'Терминатор', 'Гадкий утенок'
+        ], (
+            'Проверьте, что рейтинг лучших использует взвешенную оценку, и '
+            'одна оценка 10 не ставит произведение выше пяти оценок 9.'
+        )
+        entry = client.get(URL).json()[0]
+        assert entry['position'] == 1
+        assert 'weighted_rating' in entry
+        assert get_top(client, category='films') == ['Терминатор']
+        assert get_top(client, genre='drama') == ['Крепкий орешек']
+        assert get_top(client, year=1984) == [
+            'Терминатор', 'Гадкий утенок'
+        ]
+        assert get_top(client, genre='unknown') == []
+        response = client.get(URL, {'genre': 'drama', 'year': 1984})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_incremental_refresh(self, client, admin_client,
+                                    django_user_model):
+        from reviews.models import LeaderboardRefresh, Title
+
+        self.prepare(admin_client, django_user_model)
+        terminator = Title.objects.get(name='Терминатор')
+        admin_client.patch(
+            f'/api/v1/titles/{terminator.id}/', data={'category': 'books'}
+        )
+        call_command('refresh_leaderboards')
+        assert not LeaderboardRefresh.objects.first().full, (
+            'Проверьте, что повторный запуск `refresh_leaderboards` '
+            'пересчитывает только затронутые рейтинги.'
+        )
+        assert get_top(client, category='films') == [], (
+            'Проверьте, что произведение пропадает из рейтинга прежней '
+            'категории.'
+        )
+        assert get_top(client, category='books') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+
+        Title.objects.filter(name='Крепкий орешек').delete()
+        call_command('refresh_leaderboards', '--full')
+        assert get_top(client) == ['Терминатор', 'Гадкий утенок']
+
+    def test_03_last_place_refilled(self, client, admin_client,
+                                    django_user_model, monkeypatch):
+        from reviews import leaderboard
+        from reviews.models import LeaderboardRefresh, Title
+
+        monkeypatch.setattr(leaderboard, 'SIZE', 2)
+        monkeypatch.setattr(leaderboard, 'MEAN_TOLERANCE', 100)
+        self.prepare(admin_client, django_user_model)
+        Title.objects.filter(name='Гадкий утенок').update(year=2001)
+        call_command('refresh_leaderboards', '--full')
+        assert get_top(client) == ['Крепкий орешек', 'Терминатор']
+        hour_ago = timezone.now() - timedelta(hours=1)
+        Title.objects.update(updated=hour_ago - timedelta(minutes=5))
+        LeaderboardRefresh.objects.update(started=hour_ago)
+
+        Title.objects.filter(name='Терминатор').delete()
+        call_command('refresh_leaderboards')
+        assert not LeaderboardRefresh.objects.first().full
+        assert get_top(client) == ['Крепкий орешек', 'Гадкий утенок'], (
+            'Проверьте, что после удаления произведения c последнего места '
+            'рейтинг дополняется следующим подходящим произведением.'
+        )
+        assert get_top(client, year=1984) == []
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+URL = '/api/v1/titles/'
+
+
+def create_rated_titles():
+    from reviews.models import Title
+
+    ratings = [None, 5, 7, 7, 7, 3, None, 9, 7, 1, 5, 10]
+    for idx, rating in enumerate(ratings):
+        Title.objects.create(
+            name=f'Произведение {chr(ord("а") + (idx * 5) % 12)}',
+            year=2000 + idx % 4,
+            rating=rating,
+            rating_sum=rating or 0,
+            rating_count=1 if rating else 0,
+        )
+    return list(Title.objects.all())
+
+
+def walk_cursor_pages(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        ids += [title['id'] for title in data['results']]
+        url = data['next']
+    return ids
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleOrdering:
+
+    @pytest.mark.parametrize('ordering, key', [
+        ('year', lambda title: (title.year, title.id)),
+        ('-year', lambda title: (-title.year, -title.id)),
+        ('name', lambda title: (title.name, title.id)),
+        ('-rating', lambda title: (-(title.rating or 0), -title.id)),
+        ('rating', lambda title: (title.rating or 0, title.id)),
+        ('id', lambda title: title.id),
+        ('unknown', lambda title: -title.id),
+    ])
+    def test_01_ordering(self, client, ordering, key):
+        titles = create_rated_titles()
+        expected = [title.id for title in sorted(titles, key=key)]
+        ids = walk_cursor_pages(client, f'{URL}?ordering={ordering}')
+        assert ids == expected, (
+            f'Проверьте, что `?ordering={ordering}` упорядочивает '
+            'произведения по ключу, а при равных значениях — по id.'
+        )
+        cursor_ids = walk_cursor_pages(
+            client, f'{URL}?ordering={ordering}&pagination=cursor'
+        )
+        assert cursor_ids == expected, (
+            f'Проверьте, что курсорная пагинация c `?ordering={ordering}` '
+            'обходит все произведения в том же порядке без пропусков.'
+        )
+
+    @pytest.mark.parametrize('ordering', ['-rating', 'year', 'name'])
+    def test_02_ordering_uses_index(self, client, ordering):
+        create_rated_titles()
+        with CaptureQueriesContext(connection) as context:
+            client.get(URL, {'ordering': ordering, 'pagination': 'cursor'})
+        select = next(
+            query['sql'] for query in context.captured_queries
+            if 'ORDER BY' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {select}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что сортировка `?ordering={ordering}` читает '
+            f'составной индекс, а не сортирует таблицу: {plan}'
+        )
+
+    def test_03_indexes_match_migrations(self):
+        try:
+            call_command(
+                'makemigrations', '--check', '--dry-run', verbosity=0
+            )
+        except SystemExit:
+            pytest.fail(
+                'Проверьте, что индексы произведения в модели совпадают c '
+                'миграциями: `makemigrations --check` не должен находить '
+                'изменений.'
+            )
+
+    @pytest.mark.parametrize('ordering', ['year', '-year', '-rating'])
+    def test_04_cursor_keyset_across_ties(self, client, ordering):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(40)
+        )
+        expected = list(
+            Title.objects.order_by(
+                *(('-id',) if ordering.startswith('-') else ('id',))
+            ).values_list('id', flat=True)
+        )
+        url = f'{URL}?ordering={ordering}&pagination=cursor'
+        ids = []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                data = client.get(url).json()
+                ids += [title['id'] for title in data['results']]
+                previous, url = data['previous'], data['next']
+        assert ids == expected
+        offsets = [
+            query['sql'] for query in context.captured_queries
+            if 'OFFSET' in query['sql']
+        ]
+        assert not offsets, (
+            'Проверьте, что курсор хранит ключ сортировки вместе c id и '
+            'серия равных значений листается без OFFSET: '
+            f'{offsets[:1]}'
+        )
+        back = []
+        while previous:
+            data = client.get(previous).json()
+            back = [title['id'] for title in data['results']] + back
+            previous = data['previous']
+        assert back == expected[:len(back)] and back, (
+            'Проверьте, что ссылка previous курсорной пагинации '
+            'возвращает предыдущие страницы.'
+        )
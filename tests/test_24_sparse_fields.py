@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` c параметрами {params} '
+        'возвращает ответ со статусом 200.'
+    )
+    return response.json(), [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SparseFields:
+
+    def test_01_title_fields(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data, _ = get(admin_client, '/api/v1/titles/')
+        assert 'score_distribution' not in data['results'][0]
+        data, queries = get(admin_client, '/api/v1/titles/', fields='id,name')
+        assert [set(title) for title in data['results']] == [
+            {'id', 'name'}, {'id', 'name'}
+        ], (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля произведения.'
+        )
+        select = queries[-1]
+        assert 'description' not in select and 'reviews_category' not in (
+            select
+        ), (
+            'Проверьте, что для `?fields=` из БД загружаются только нужные '
+            f'столбцы и связи: {select}'
+        )
+        assert not any('reviews_genre' in query for query in queries), (
+            'Проверьте, что жанры не загружаются, если они не запрошены.'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        data, _ = get(
+            admin_client, url, fields='name,category',
+            expand='score_distribution'
+        )
+        assert set(data) == {'name', 'category', 'score_distribution'}, (
+            'Проверьте, что `?expand=` добавляет поле к полям из `?fields=`.'
+        )
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+
+        data, _ = get(admin_client, url, fields='id,score_distribution')
+        assert set(data) == {'id', 'score_distribution'}, (
+            'Проверьте, что поле из `?expand=`, указанное в `?fields=`, '
+            'выводится и без `?expand=`.'
+        )
+        assert data['score_distribution'] == {
+            str(score): 0 for score in range(1, 11)
+        }
+        data, _ = get(admin_client, url, fields='category')
+        assert data == {'category': {'name': 'Фильм', 'slug': 'films'}}
+
+    def test_02_unknown_fields(self, admin_client):
+        create_titles(admin_client)
+        for params in ({'fields': 'id,secret'}, {'expand': 'genre'}):
+            response = admin_client.get('/api/v1/titles/', params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что неизвестное поле в `?fields=` или '
+                '`?expand=` возвращает ответ со статусом 400.'
+            )
+
+    def test_03_review_and_comment_fields(self, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, queries = get(admin_client, url, fields='id,score')
+        assert data['results'] == [{'id': reviews[0]['id'], 'score': 5}]
+        assert 'core_user' not in queries[-1]
+        data, _ = get(admin_client, url, expand='author')
+        assert data['results'][0]['author']['username'] == admin.username, (
+            'Проверьте, что `?expand=author` разворачивает автора отзыва.'
+        )
+
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        data, _ = get(admin_client, url, fields='text', expand='author')
+        assert data['results'] == [{
+            'text': comments[0]['text'],
+            'author': {
+                'username': admin.username,
+                'first_name': admin.first_name,
+                'last_name': admin.last_name,
+                'bio': admin.bio,
+            },
+        }]
+
+    def test_04_cursor_with_sparse_fields(self, client):
+        from reviews.models import Title
+
+        for idx in range(12):
+            Title.objects.create(name=f'Произведение {idx:02}', year=2000)
+        _, queries = get(
+            client, '/api/v1/titles/',
+            fields='id', ordering='name', pagination='cursor',
+        )
+        assert len(queries) == 1, (
+            'Проверьте, что ключ курсорной пагинации загружается вместе c '
+            'запрошенными полями, без отдельных запросов.'
+        )
@@ -0,0 +1,145 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+URL = '/api/v1/titles/bulk/'
+
+
+def make_items(genres, categories, count, prefix='Новинка'):
+    return [
+        {
+            'name': f'{prefix} {idx}',
+            'year': 2000 + idx % 20,
+            'category': categories[idx % 2]['slug'],
+            'genre': [genre['slug'] for genre in genres[:idx % 3 + 1]],
+            'description': 'Описание',
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25BulkTitles:
+
+    def test_01_json_array(self, client, admin_client):
+        from reviews.models import Title
+
+        _, categories, genres = create_titles(admin_client)
+        items = make_items(genres, categories, 3)
+        items.insert(1, dict(items[0], category='missing'))
+        response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            f'Проверьте, что POST-запрос к `{URL}` c некорректными '
+            'элементами возвращает ответ со статусом 207.'
+        )
+        data = response.json()
+        assert data['created'] == 3
+        statuses = [result['status'] for result in data['results']]
+        assert statuses == [201, 400, 201, 201], (
+            'Проверьте, что результаты возвращаются для каждого элемента '
+            'в порядке запроса.'
+        )
+        assert 'category' in data['results'][1]['errors']
+
+        for item, result in zip(items[:1] + items[2:], data['results'][:1]
+                                + data['results'][2:]):
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == item['name']
+            assert title.category.slug == item['category']
+            assert sorted(title.genre.values_list('slug', flat=True)) == (
+                sorted(item['genre'])
+            ), 'Проверьте, что созданы связи произведений c жанрами.'
+
+        response = client.get('/api/v1/titles/', {'q': 'новинка'})
+        assert response.json()['count'] == 3, (
+            'Проверьте, что созданные произведения доступны в поиске.'
+        )
+        response = client.get(
+            '/api/v1/titles/autocomplete/', {'prefix': 'новинка'}
+        )
+        assert len(response.json()) == 3, (
+            'Проверьте, что созданные произведения появляются в подсказках.'
+        )
+
+    def test_02_ndjson(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        items = make_items(genres, categories, 2)
+        body = '\n'.join(json.dumps(item) for item in items) + '\n\n'
+        response = admin_client.post(
+            URL, data=body, content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{URL}` принимает NDJSON.'
+        )
+        assert response.json()['created'] == 2
+
+        response = admin_client.post(
+            URL, data='{"name": "x"}\n{broken\n',
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'Строка 2' in response.json()['detail']
+
+    def test_03_constant_queries(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+
+        def count_queries(items):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(URL, data=items, format='json')
+            assert response.status_code == HTTPStatus.CREATED
+            return len(context.captured_queries)
+
+        few_queries = count_queries(make_items(genres, categories, 2, 'A'))
+        many_queries = count_queries(make_items(genres, categories, 50, 'B'))
+        assert many_queries == few_queries, (
+            f'Проверьте, что POST-запрос к `{URL}` выполняет постоянное '
+            'количество запросов к БД независимо от числа произведений. '
+            f'Сейчас: {few_queries} и {many_queries}.'
+        )
+
+    def test_04_permissions_and_errors(self, client, user_client,
+                                       admin_client):
+        _, categories, genres = create_titles(admin_client)
+        items = make_items(genres, categories, 1)
+        response = client.post(
+            URL, data=json.dumps(items), content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос к `{URL}` доступен только '
+            'администратору.'
+        )
+        response = admin_client.post(URL, data=items[0], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{URL}` не со списком '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_05_numeric_slugs(self, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        Genre.objects.create(name='Пятый', slug='5')
+        Category.objects.create(name='Седьмая', slug='7')
+        item = {'name': 'Числа', 'year': 2000, 'category': 7, 'genre': [5]}
+        response = admin_client.post(
+            '/api/v1/titles/', data=json.dumps(item),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(
+            URL, data=json.dumps([dict(item, name='Числа 2')]),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что `{URL}` принимает слаги-числа так же, как '
+            f'POST-запрос к `/api/v1/titles/`: {response.json()}'
+        )
+        title = Title.objects.get(pk=response.json()['results'][0]['id'])
+        assert title.category.slug == '7'
+        assert list(title.genre.values_list('slug', flat=True)) == ['5']
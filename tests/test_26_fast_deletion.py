@@ -0,0 +1,228 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def add_reviews(title_id, count, prefix, comments=0):
+    from core.models import User
+    from reviews.models import Comment, Review
+
+    reviews = []
+    for idx in range(count):
+        author = User.objects.create(
+            username=f'{prefix}{idx}', email=f'{prefix}{idx}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title_id=title_id, author=author, text='Отзыв',
+            score=idx % 10 + 1
+        )
+        for _ in range(comments):
+            Comment.objects.create(
+                review=review, author=author, text='Комментарий'
+            )
+        reviews.append(review)
+    return reviews
+
+
+def assert_counters_consistent():
+    from reviews.models import Title
+    from reviews.services import find_inconsistent_ratings
+
+    assert not find_inconsistent_ratings().exists(), (
+        'Проверьте, что после удаления счетчики рейтинга произведений '
+        'совпадают c отзывами.'
+    )
+    for title in Title.objects.all():
+        distribution = {
+            score: title.reviews.filter(score=score).count()
+            for score in range(1, 11)
+        }
+        assert title.score_distribution == distribution, (
+            'Проверьте, что после удаления распределение оценок '
+            'произведения совпадает c отзывами.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26FastDeletion:
+
+    def test_01_title_delete_queries(self, admin_client):
+        from reviews.models import Comment, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        add_reviews(titles[0]['id'], 2, 'few')
+        add_reviews(titles[1]['id'], 20, 'many', comments=2)
+        kept = Title.objects.create(name='Остается', year=2000)
+        add_reviews(kept.id, 3, 'kept', comments=1)
+
+        queries = []
+        for title in titles:
+            url = f'/api/v1/titles/{title["id"]}/'
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            queries.append(len(context.captured_queries))
+        assert queries[0] == queries[1], (
+            'Проверьте, что удаление произведения выполняет постоянное '
+            'количество запросов к БД независимо от числа отзывов и '
+            f'комментариев. Сейчас: {queries}.'
+        )
+        assert list(Title.objects.values_list('id', flat=True)) == [kept.id]
+        assert Review.objects.count() == 3
+        assert Comment.objects.count() == 3
+        assert_counters_consistent()
+
+    def test_02_user_delete_keeps_counters(self, admin_client, user):
+        from core.models import User
+        from reviews.models import Comment, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            review = Review.objects.create(
+                title_id=title['id'], author=user, text='Отзыв', score=10
+            )
+            add_reviews(title['id'], 3, f'other{title["id"]}-')
+            other = User.objects.exclude(pk=user.pk).first()
+            Comment.objects.create(review=review, author=other, text='К')
+            Comment.objects.create(
+                review=Review.objects.exclude(author=user).first(),
+                author=user, text='К'
+            )
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert not Review.objects.filter(author_id=user.pk).exists()
+        assert not Comment.objects.filter(author_id=user.pk).exists()
+        assert Comment.objects.count() == 0, (
+            'Проверьте, что вместе c отзывами пользователя удаляются и '
+            'комментарии к ним.'
+        )
+        assert_counters_consistent()
+        assert Title.objects.get(pk=titles[0]['id']).rating_count == 3
+
+    def test_03_review_delete(self, client, admin_client):
+        from reviews.models import Comment, Title
+
+        titles, _, _ = create_titles(admin_client)
+        review, _ = add_reviews(titles[0]['id'], 2, 'author', comments=2)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/'
+        etag = client.get(url)['ETag']
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Comment.objects.filter(review_id=review.id).exists()
+        assert_counters_consistent()
+        assert Title.objects.get(pk=titles[0]['id']).rating_count == 1
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления отзыва условный GET-запрос c '
+            'прежним ETag не возвращает 304.'
+        )
+
+    def test_04_background_deletion(self, admin_client, monkeypatch):
+        from core import deletion
+        from core.models import DeletionJob
+        from reviews.models import Review, Title
+
+        monkeypatch.setattr(deletion, 'BACKGROUND_THRESHOLD', 2)
+        titles, _, _ = create_titles(admin_client)
+        add_reviews(titles[0]['id'], 3, 'bg', comments=1)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что удаление произведения c большим числом '
+            'отзывов ставится в очередь и возвращает ответ 202.'
+        )
+        job_id = response.json()['job']
+        assert admin_client.delete(url).json()['job'] == job_id, (
+            'Проверьте, что повторное удаление не создает новое задание.'
+        )
+        assert Title.objects.filter(pk=titles[0]['id']).exists()
+
+        response = admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        call_command('run_deletion_jobs', '--once')
+        assert DeletionJob.objects.get(pk=job_id).status == DeletionJob.DONE
+        assert not Title.objects.exists()
+        assert not Review.objects.exists()
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_review_delete_uses_deltas(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.get('/api/v1/users/me/')
+        few = add_reviews(titles[0]['id'], 2, 'few')
+        many = add_reviews(titles[1]['id'], 20, 'many')
+
+        queries = []
+        for review in (few[0], many[0]):
+            url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            queries.append([
+                query['sql'] for query in context.captured_queries
+            ])
+        assert len(queries[0]) == len(queries[1]), (
+            'Проверьте, что удаление отзыва выполняет постоянное количество '
+            'запросов независимо от числа отзывов на произведение.'
+        )
+        updates = [sql for sql in queries[1] if sql.startswith('UPDATE')]
+        assert len(updates) == 1 and 'SELECT' not in updates[0], (
+            'Проверьте, что удаление отзыва сдвигает счетчики произведения '
+            'одним UPDATE без пересчета по всем отзывам.'
+        )
+        assert_counters_consistent()
+        assert Title.objects.get(pk=titles[1]['id']).rating_count == 19
+
+    def test_06_queued_user_is_deactivated(
+        self, admin_client, user, user_client, monkeypatch
+    ):
+        from core import deletion
+        from core.models import User
+        from reviews.models import Review
+
+        monkeypatch.setattr(deletion, 'BACKGROUND_THRESHOLD', 1)
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            add_reviews(title['id'], 1, f'u{title["id"]}-')
+            Review.objects.create(
+                title_id=title['id'], author=user, text='Отзыв', score=5
+            )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert not User.objects.get(pk=user.pk).is_active, (
+            'Проверьте, что пользователь, удаление которого поставлено в '
+            'очередь, сразу деактивируется.'
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что до выполнения задания удаляемый пользователь '
+            'не может пользоваться API.'
+        )
+        call_command('run_deletion_jobs', '--once')
+        assert not User.objects.filter(pk=user.pk).exists()
+
+    def test_07_title_threshold_counts_comments(
+        self, admin_client, monkeypatch
+    ):
+        from core import deletion
+
+        monkeypatch.setattr(deletion, 'BACKGROUND_THRESHOLD', 3)
+        titles, _, _ = create_titles(admin_client)
+        add_reviews(titles[0]['id'], 1, 'talk', comments=3)
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что порог фонового удаления произведения учитывает '
+            'не только отзывы, но и комментарии к ним.'
+        )
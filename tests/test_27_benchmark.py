@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+DATASET = (
+    '--users', '5', '--titles', '20', '--reviews', '60',
+    '--comments', '10', '--iterations', '2',
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Benchmark:
+
+    def test_01_benchmark_writes_report(self, tmp_path):
+        from reviews.models import Title
+
+        output = tmp_path / 'report.json'
+        call_command('benchmark', *DATASET, '--output', str(output))
+        report = json.loads(output.read_text(encoding='utf8'))
+        assert report['dataset']['titles'] == 20
+        assert report['dataset']['reviews'] == 60
+        assert 'titles-list' in report['endpoints'], (
+            'Проверьте, что `benchmark` замеряет эндпоинты API.'
+        )
+        for result in report['endpoints'].values():
+            assert set(result) == {
+                'url', 'p50_ms', 'p95_ms', 'queries', 'peak_memory_kb'
+            }
+        assert report['endpoints']['titles-list']['queries'] >= 1, (
+            'Проверьте, что `benchmark` считает запросы к БД.'
+        )
+        assert not Title.objects.exists(), (
+            'Проверьте, что `benchmark` создает данные во временной БД, '
+            'a не в рабочей.'
+        )
+
+    def test_02_benchmark_fails_on_regression(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({'endpoints': {
+            'titles-list': {'queries': 0, 'p95_ms': 0.0},
+            'unknown-endpoint': {'queries': 0, 'p95_ms': 0.0},
+        }}), encoding='utf8')
+        with pytest.raises(CommandError, match='ухудшений'):
+            call_command(
+                'benchmark', *DATASET,
+                '--output', str(tmp_path / 'report.json'),
+                '--baseline', str(baseline),
+            )
+
+    def test_03_iterations_must_be_positive(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command(
+                'benchmark', '--iterations', '0',
+                '--output', str(tmp_path / 'report.json'),
+            )